@@ -1,5 +1,6 @@
 import asyncio
 import logging
+import os
 from pydantic import BaseModel
 from typing import Any, Dict, List, Optional, Union, Tuple
 
@@ -16,8 +17,14 @@ class OllamaClient:
         structured_output_schema: Optional[BaseModel] = None,
         use_async: bool = False,
         tool_calling: bool = False,
+        host: Optional[str] = None,
+        timeout: Optional[float] = None,
     ):
-        """Initialize Ollama Client."""
+        """
+        Initialize Ollama Client.
+        host defaults to the OLLAMA_HOST environment variable (or the local server);
+        timeout is a per-request timeout in seconds.
+        """
         self.model_name = model_name
         self.logger = logging.getLogger("OllamaClient")
         self.logger.setLevel(logging.INFO)
@@ -38,10 +45,15 @@ class OllamaClient:
         if structured_output_schema:
             self.format_structured_output = structured_output_schema.model_json_schema()
 
-        # For async calls
-        from ollama import AsyncClient
+        self.host = host or os.getenv("OLLAMA_HOST", "http://127.0.0.1:11434")
+        self.timeout = timeout
+        self.backend_key = f"ollama:{self.host}"
 
-        self.client = AsyncClient() if use_async else None
+        from ollama import AsyncClient, Client
+
+        self.sync_client = Client(host=self.host, timeout=timeout)
+        # For async calls
+        self.client = AsyncClient(host=self.host, timeout=timeout) if use_async else None
 
         # Ensure model is pulled
         self._ensure_model_available()
@@ -69,19 +81,38 @@ class OllamaClient:
     def _ensure_model_available(self):
         import ollama
 
+        # Loading and pulling a model can take far longer than any chat call, and a
+        # non-streaming pull sends nothing until the download finishes, so neither
+        # goes through the client with the per-request timeout
+        setup_client = ollama.Client(host=self.host)
         try:
-            ollama.chat(
-                model=self.model_name, messages=[{"role": "system", "content": "test"}]
+            # Warm up with the same num_ctx as real calls: a different context size would
+            # make the first real call reload the model
+            setup_client.chat(
+                model=self.model_name, messages=[{"role": "system", "content": "test"}],
+                options={"num_ctx": self.num_ctx, "num_predict": 1},
             )
         except ollama.ResponseError as e:
             if e.status_code == 404:
                 self.logger.info(
                     f"Model {self.model_name} not found locally. Pulling..."
                 )
-                ollama.pull(self.model_name)
+                setup_client.pull(self.model_name)
                 self.logger.info(f"Successfully pulled model {self.model_name}")
             else:
                 raise
+        finally:
+            setup_client.close()
+
+    def _sync_client_for(self, timeout: Optional[float]):
+        """
+        Client honouring a per-call timeout. The ollama library only takes timeouts per
+        client, so a shorter one gets a short-lived client of its own.
+        """
+        if timeout is None or (self.timeout is not None and timeout >= self.timeout):
+            return self.sync_client
+        from ollama import Client
+        return Client(host=self.host, timeout=timeout)
 
     def _prepare_options(self):
         """Common chat options for both sync and async calls."""
@@ -167,6 +198,8 @@ class OllamaClient:
 
         # Now we have a list of dictionaries. We'll call them in parallel.
         chat_kwargs = self._prepare_options()
+        # Per-call timeouts are only supported for sync calls
+        kwargs.pop("timeout", None)
 
         async def process_one(msg):
             resp = await self.client.chat(
@@ -203,14 +236,13 @@ class OllamaClient:
         we do one call for that entire conversation. If you pass a single dict,
         we wrap it in a list so there's no error.
         """
-        import ollama
-
         # If the user provided a single dictionary, wrap it
         if isinstance(messages, dict):
             messages = [messages]
 
         # Now messages is a list of dicts, so we can pass it to Ollama in one go
         chat_kwargs = self._prepare_options()
+        client = self._sync_client_for(kwargs.pop("timeout", None))
 
         responses = []
         usage_total = Usage()
@@ -224,7 +256,7 @@ class OllamaClient:
             # If you want multiple calls, you can either:
             #   (a) loop outside of this function, or
             #   (b) pass a list-of-lists approach that you handle similarly
-            response = ollama.chat(
+            response = client.chat(
                 model=self.model_name,
                 messages=messages,
                 **chat_kwargs,
@@ -244,6 +276,9 @@ class OllamaClient:
         except Exception as e:
             self.logger.error(f"Error during Ollama API call: {e}")
             raise
+        finally:
+            if client is not self.sync_client:
+                client.close()
 
         if self.return_tools:
             return responses, usage_total, done_reasons, tools
@@ -271,7 +306,5 @@ class OllamaClient:
         **kwargs,
     ):
         """Embed content using model (must support embeddings)."""
-        import ollama
-
-        response = ollama.embed(model=self.model_name, input=content, **kwargs)
+        response = self.sync_client.embed(model=self.model_name, input=content, **kwargs)
         return response["embeddings"]
\ No newline at end of file
@@ -18,6 +18,8 @@ class OpenAIClient:
         use_responses_api: bool = False,
         tools: List[Dict[str, Any]] = None,
         reasoning_effort: str = "low",
+        timeout: Optional[float] = None,
+        max_retries: int = 2,
     ):
         """
         Initialize the OpenAI client.
@@ -28,6 +30,8 @@ class OpenAIClient:
             temperature: Sampling temperature (default: 0.0)
             max_tokens: Maximum number of tokens to generate (default: 4096)
             base_url: Base URL for the OpenAI API (optional, falls back to OPENAI_BASE_URL environment variable or default URL)
+            timeout: Per-request timeout in seconds (optional, defaults to the SDK timeout)
+            max_retries: Retries performed by the SDK itself (set to 0 when retrying in a resilience layer)
         """
         self.model_name = model_name
         self.api_key = api_key or os.getenv("OPENAI_API_KEY")
@@ -39,8 +43,14 @@ class OpenAIClient:
             "OPENAI_BASE_URL", "https://api.openai.com/v1"
         )
 
+        self.timeout = timeout
+        self.backend_key = f"openai:{self.base_url}"
+
         # Initialize the client
-        self.client = openai.OpenAI(api_key=self.api_key, base_url=self.base_url)
+        client_kwargs = {"api_key": self.api_key, "base_url": self.base_url, "max_retries": max_retries}
+        if timeout is not None:
+            client_kwargs["timeout"] = timeout
+        self.client = openai.OpenAI(**client_kwargs)
         if "o1-pro" in self.model_name:
             self.use_responses_api = True
         else:
@@ -94,9 +104,11 @@ class OpenAIClient:
         usage = response.usage.input_tokens
 
         # Extract usage information
+        input_details = getattr(response.usage, "input_tokens_details", None)
         usage = Usage(
             prompt_tokens=response.usage.input_tokens,
             completion_tokens=response.usage.output_tokens,
+            cached_prompt_tokens=getattr(input_details, "cached_tokens", 0) or 0,
         )
 
         return outputs, usage
@@ -137,9 +149,11 @@ class OpenAIClient:
                 raise
 
             # Extract usage information
+            prompt_details = getattr(response.usage, "prompt_tokens_details", None)
             usage = Usage(
                 prompt_tokens=response.usage.prompt_tokens,
                 completion_tokens=response.usage.completion_tokens,
+                cached_prompt_tokens=getattr(prompt_details, "cached_tokens", 0) or 0,
             )
 
             # The content is now nested under message
@@ -0,0 +1,211 @@
+import logging
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger("Resilience")
+
+# HTTP statuses worth retrying: timeouts, conflicts, rate limits and server-side failures
+TRANSIENT_STATUS_CODES = {408, 409, 425, 429}
+
+# Exception class names (matched along the MRO) raised by openai / httpx for transient failures.
+# Matching by name keeps this module free of optional client dependencies.
+TRANSIENT_ERROR_NAMES = {
+    "APITimeoutError",
+    "APIConnectionError",
+    "RateLimitError",
+    "InternalServerError",
+    "TimeoutException",
+    "NetworkError",
+    "RemoteProtocolError",
+}
+
+
+class ModelCallError(Exception):
+    """
+    A model call that failed for good (after retries, past its deadline, or rejected by an
+    open circuit). Callers must treat it as a missing result, never as an answer.
+    """
+
+
+class CircuitOpenError(ModelCallError):
+    """Raised without calling the backend while its circuit breaker is open."""
+
+
+@dataclass
+class RetryPolicy:
+    """
+    Retry and deadline settings for one model call.
+    The deadline bounds the whole call including retries and backoff: no attempt starts
+    after it, and when the call is given a per-attempt timeout every attempt is cut short
+    to the time left before it.
+    """
+    max_attempts: int = 3
+    initial_backoff: float = 1.0
+    max_backoff: float = 30.0
+    multiplier: float = 2.0
+    jitter: float = 0.2
+    deadline: Optional[float] = 180.0
+
+    def backoff(self, attempt: int) -> float:
+        """Delay before retry number `attempt` (1-based), with multiplicative jitter."""
+        delay = min(self.initial_backoff * self.multiplier ** (attempt - 1), self.max_backoff)
+        return delay * (1 + random.uniform(-self.jitter, self.jitter))
+
+
+def is_transient(exc: BaseException) -> bool:
+    """True for failures that a retry may fix: timeouts, dropped connections, 429s and 5xx."""
+    if isinstance(exc, (ConnectionError, TimeoutError)):
+        return True
+    status = getattr(exc, "status_code", None)
+    if isinstance(status, int) and status > 0:
+        return status in TRANSIENT_STATUS_CODES or status >= 500
+    return any(cls.__name__ in TRANSIENT_ERROR_NAMES for cls in type(exc).__mro__)
+
+
+def is_rate_limited(exc: BaseException) -> bool:
+    """True for 429 responses: worth retrying, but proof that the backend is up."""
+    if getattr(exc, "status_code", None) == 429:
+        return True
+    return any(cls.__name__ == "RateLimitError" for cls in type(exc).__mro__)
+
+
+class CircuitBreaker:
+    """
+    Per-backend circuit breaker.
+    After `failure_threshold` consecutive transient failures the circuit opens and calls fail
+    fast with CircuitOpenError. Once `reset_timeout` seconds have passed a single trial call
+    is let through (half-open); its outcome closes the circuit again or re-opens it.
+    """
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self.opened_at is None:
+                return "closed"
+            if time.monotonic() - self.opened_at >= self.reset_timeout:
+                return "half_open"
+            return "open"
+
+    def allow(self):
+        """Raise CircuitOpenError if a call to this backend should not be attempted now."""
+        with self._lock:
+            if self.opened_at is None:
+                return
+            waited = time.monotonic() - self.opened_at
+            if waited >= self.reset_timeout and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return
+            raise CircuitOpenError(
+                f"Circuit for {self.name} is open after {self.failures} consecutive failures; "
+                f"retrying in {max(self.reset_timeout - waited, 0):.0f}s"
+            )
+
+    def record_success(self):
+        with self._lock:
+            if self.opened_at is not None:
+                logger.info(f"Circuit for {self.name} closed")
+            self.failures = 0
+            self.opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._trial_in_flight or (self.opened_at is None and self.failures >= self.failure_threshold):
+                logger.warning(f"Circuit for {self.name} opened after {self.failures} consecutive failures")
+                self.opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+# Seconds spent sleeping between retries, process-wide (see total_backoff_seconds)
+_backoff_seconds = 0.0
+_backoff_lock = threading.Lock()
+
+
+def total_backoff_seconds() -> float:
+    """Total time call_with_resilience has spent in backoff sleeps so far, across threads."""
+    with _backoff_lock:
+        return _backoff_seconds
+
+
+def get_breaker(backend_key: str) -> CircuitBreaker:
+    """Shared circuit breaker for a backend (e.g. "ollama:http://host:11434")."""
+    with _breakers_lock:
+        breaker = _breakers.get(backend_key)
+        if breaker is None:
+            breaker = _breakers[backend_key] = CircuitBreaker(backend_key)
+        return breaker
+
+
+def call_with_resilience(fn: Callable[..., Any], *args,
+                         policy: Optional[RetryPolicy] = None,
+                         breaker: Optional[CircuitBreaker] = None,
+                         label: str = "Model call",
+                         timeout: Optional[float] = None,
+                         **kwargs) -> Any:
+    """
+    Call fn(*args, **kwargs) with bounded retries and exponential backoff for transient
+    errors, an overall deadline, and an optional circuit breaker.
+    With a per-attempt timeout, fn is also passed timeout=min(timeout, time left before the
+    deadline), so the deadline holds even while an attempt is in flight.
+    Raises ModelCallError (or CircuitOpenError) when the call cannot produce a result.
+    """
+    policy = policy or RetryPolicy()
+    start = time.monotonic()
+    attempt = 0
+    while True:
+        attempt += 1
+        if breaker is not None:
+            breaker.allow()
+        attempt_kwargs = kwargs
+        if timeout is not None:
+            attempt_timeout = timeout
+            if policy.deadline is not None:
+                remaining = policy.deadline - (time.monotonic() - start)
+                if remaining <= 0:
+                    raise ModelCallError(f"{label} exceeded its {policy.deadline:g}s deadline")
+                attempt_timeout = min(timeout, remaining)
+            attempt_kwargs = dict(kwargs, timeout=attempt_timeout)
+        try:
+            result = fn(*args, **attempt_kwargs)
+        except Exception as e:
+            transient = is_transient(e)
+            if breaker is not None:
+                # A non-transient error (e.g. a 400) or a rate limit means the backend is up
+                # and answering; only outages count towards opening the circuit
+                if transient and not is_rate_limited(e):
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+            if not transient:
+                raise ModelCallError(f"{label} failed: {e}") from e
+            if attempt >= policy.max_attempts:
+                raise ModelCallError(f"{label} failed after {attempt} attempts: {e}") from e
+            delay = policy.backoff(attempt)
+            elapsed = time.monotonic() - start
+            if policy.deadline is not None and elapsed + delay >= policy.deadline:
+                raise ModelCallError(f"{label} exceeded its {policy.deadline:g}s deadline: {e}") from e
+            logger.warning(f"{label} attempt {attempt} failed ({e}); retrying in {delay:.1f}s")
+            time.sleep(delay)
+            global _backoff_seconds
+            with _backoff_lock:
+                _backoff_seconds += delay
+            continue
+        if breaker is not None:
+            breaker.record_success()
+        return result
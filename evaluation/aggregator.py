@@ -1,4 +1,7 @@
-from typing import Dict, List
+from dataclasses import dataclass
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
 
 def summarize_scores(scores: Dict[str, Dict[str, List[int]]]) -> Dict[str, Dict[str, float]]:
     """
@@ -13,4 +16,65 @@ def summarize_scores(scores: Dict[str, Dict[str, List[int]]]) -> Dict[str, Dict[
                 summary[model_name][skill] = sum(score_list) / len(score_list)
             else:
                 summary[model_name][skill] = None
-    return summary
\ No newline at end of file
+    return summary
+
+
+@dataclass
+class ScoreQuantiles:
+    """
+    Pre-aggregated score distribution for a models x skills matrix.
+    Cells without scores hold NaN in `quantiles` and `means` and 0 in `counts`.
+    """
+    models: List[str]
+    skills: List[str]
+    levels: Tuple[float, ...]
+    quantiles: np.ndarray  # shape (num_models, num_skills, num_levels)
+    means: np.ndarray      # shape (num_models, num_skills)
+    counts: np.ndarray     # shape (num_models, num_skills)
+
+
+def summarize_quantiles(scores: Dict[str, Dict[str, List[int]]],
+                        levels: Sequence[float] = (0.05, 0.25, 0.5, 0.75, 0.95)) -> ScoreQuantiles:
+    """
+    Compute per (model, skill) quantiles and means of the raw score lists.
+    All cells are padded into one NaN-filled array and reduced in a single vectorized pass,
+    so the cost is dominated by one sort over (models * skills, max tests) values.
+    """
+    models = list(scores.keys())
+    skills = sorted({skill for model_scores in scores.values() for skill in model_scores.keys()})
+    levels = tuple(levels)
+    num_cells = len(models) * len(skills)
+
+    cell_lists = [scores[m].get(s, []) for m in models for s in skills]
+    counts = np.fromiter((len(c) for c in cell_lists), dtype=np.int64, count=num_cells)
+    width = int(counts.max()) if num_cells else 0
+
+    padded = np.full((num_cells, max(width, 1)), np.nan)
+    for row, cell in enumerate(cell_lists):
+        if cell:
+            padded[row, :len(cell)] = cell
+
+    # NaNs sort to the end of each row, so the first counts[row] entries are the sorted scores
+    padded.sort(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = np.nansum(padded, axis=1) / counts
+
+    # Linear interpolation between order statistics (numpy's default "linear" method)
+    positions = np.outer(np.maximum(counts - 1, 0), np.asarray(levels, dtype=float))
+    lower = np.floor(positions).astype(np.int64)
+    upper = np.ceil(positions).astype(np.int64)
+    frac = positions - lower
+    low_vals = np.take_along_axis(padded, lower, axis=1)
+    high_vals = np.take_along_axis(padded, upper, axis=1)
+    quantiles = low_vals + (high_vals - low_vals) * frac
+    quantiles[counts == 0] = np.nan
+
+    shape = (len(models), len(skills))
+    return ScoreQuantiles(
+        models=models,
+        skills=skills,
+        levels=levels,
+        quantiles=quantiles.reshape(shape + (len(levels),)),
+        means=means.reshape(shape),
+        counts=counts.reshape(shape),
+    )
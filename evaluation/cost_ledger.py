@@ -0,0 +1,236 @@
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+from clients.usage import Usage
+
+logger = logging.getLogger("CostLedger")
+
+# Attribution of the calls made in the current thread / asyncio task.
+# phase: "answer", "grade" or "test-gen"; skill: skill being tested; subject: local model being evaluated
+_charge_context: contextvars.ContextVar = contextvars.ContextVar("charge_context", default={})
+
+
+@contextmanager
+def charge_context(**fields: Optional[str]):
+    """
+    Attribute every model call made inside the block to the given phase / skill / subject.
+    Nested blocks add to (and override) the enclosing attribution.
+    """
+    token = _charge_context.set({**_charge_context.get(), **fields})
+    try:
+        yield
+    finally:
+        _charge_context.reset(token)
+
+
+class CostMeter:
+    """Running cost of the calls made inside a metered() block, including worker threads."""
+    def __init__(self):
+        self.cost = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, cost: float):
+        with self._lock:
+            self.cost += cost
+
+
+_cost_meters: contextvars.ContextVar = contextvars.ContextVar("cost_meters", default=())
+
+
+@contextmanager
+def metered():
+    """
+    Measure the cost of every call recorded by a CostLedger inside the block, e.g. to
+    store the cost of one evaluated cell with its result. Blocks can be nested.
+    """
+    meter = CostMeter()
+    token = _cost_meters.set(_cost_meters.get() + (meter,))
+    try:
+        yield meter
+    finally:
+        _cost_meters.reset(token)
+
+
+@dataclass
+class ModelPrice:
+    """Prices in USD per million tokens."""
+    prompt: float = 0.0
+    completion: float = 0.0
+    cached_prompt: Optional[float] = None  # defaults to the prompt price
+
+    def cost(self, usage: Usage) -> float:
+        cached = min(usage.cached_prompt_tokens, usage.prompt_tokens)
+        cached_price = self.prompt if self.cached_prompt is None else self.cached_prompt
+        return ((usage.prompt_tokens - cached) * self.prompt
+                + cached * cached_price
+                + usage.completion_tokens * self.completion) / 1_000_000
+
+
+# List prices at the time of writing; override them with a price file for real accounting.
+DEFAULT_PRICES: Dict[str, ModelPrice] = {
+    "gpt-4o-mini": ModelPrice(prompt=0.15, completion=0.60, cached_prompt=0.075),
+    "gpt-4o": ModelPrice(prompt=2.50, completion=10.00, cached_prompt=1.25),
+    "gpt-4-turbo": ModelPrice(prompt=10.00, completion=30.00),
+    "gpt-4": ModelPrice(prompt=30.00, completion=60.00),
+    "gpt-3.5-turbo": ModelPrice(prompt=0.50, completion=1.50),
+    "o3-mini": ModelPrice(prompt=1.10, completion=4.40, cached_prompt=0.55),
+}
+
+
+class PriceTable:
+    """
+    Maps model names to prices. A model matches its exact name first, then the longest
+    configured prefix (so "gpt-4o-2024-08-06" is priced as "gpt-4o"). Unknown models, such as
+    local Ollama models, cost nothing unless priced explicitly.
+    """
+    def __init__(self, prices: Optional[Dict[str, ModelPrice]] = None):
+        self.prices = dict(DEFAULT_PRICES if prices is None else prices)
+        self._warned = set()
+
+    @classmethod
+    def load(cls, path: str) -> "PriceTable":
+        """
+        Load prices from a JSON or YAML file of the form
+        { model_name: {prompt: ..., completion: ..., cached_prompt: ...}, ... }
+        Entries override the defaults.
+        """
+        with open(path, "r", encoding="utf-8") as f:
+            if os.path.splitext(path)[1].lower() in (".yaml", ".yml"):
+                import yaml
+                raw = yaml.safe_load(f) or {}
+            else:
+                raw = json.load(f)
+        prices = dict(DEFAULT_PRICES)
+        prices.update({name: ModelPrice(**entry) for name, entry in raw.items()})
+        return cls(prices)
+
+    def price_for(self, model_name: str) -> ModelPrice:
+        if model_name in self.prices:
+            return self.prices[model_name]
+        matches = [name for name in self.prices if model_name.startswith(name)]
+        if matches:
+            return self.prices[max(matches, key=len)]
+        if model_name not in self._warned:
+            self._warned.add(model_name)
+            logger.info(f"No price configured for '{model_name}'; treating it as free")
+        return ModelPrice()
+
+
+class BudgetExceeded(Exception):
+    """Raised when the hard budget of a run has been spent."""
+
+
+class CostLedger:
+    """
+    Per-run ledger of token usage and cost, aggregated by (model, phase, skill, subject).
+    record() takes the attribution from charge_context, so it can be called from any thread
+    or asyncio task. All updates happen under one lock that is never held across I/O or await.
+
+    soft_budget: once reached, admit_work() slows down scheduling by throttle_seconds per item.
+    hard_budget: once reached, admit_work() raises BudgetExceeded so no new work is started.
+    Calls already in flight still complete and are recorded, so the hard cap can be overshot
+    by at most the cost of the in-flight calls.
+    """
+    def __init__(self, prices: Optional[PriceTable] = None, soft_budget: Optional[float] = None,
+                 hard_budget: Optional[float] = None, throttle_seconds: float = 1.0):
+        self.prices = prices or PriceTable()
+        self.soft_budget = soft_budget
+        self.hard_budget = hard_budget
+        self.throttle_seconds = throttle_seconds
+        self.entries: Dict[Tuple[str, str, str, str], Dict[str, Any]] = {}
+        self.total_cost = 0.0
+        self._soft_warned = False
+        self._lock = threading.Lock()
+
+    def record(self, model: str, price_model: str, usage: Usage) -> float:
+        """Add the usage of one call by `model` (priced as `price_model`). Returns its cost."""
+        context = _charge_context.get()
+        key = (model, context.get("phase") or "other", context.get("skill") or "-", context.get("subject") or "-")
+        cost = self.prices.price_for(price_model).cost(usage)
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                entry = self.entries[key] = {"usage": Usage(), "cost": 0.0, "calls": 0}
+            entry["usage"] = entry["usage"] + usage
+            entry["cost"] += cost
+            entry["calls"] += 1
+            self.total_cost += cost
+        for meter in _cost_meters.get():
+            meter.add(cost)
+        return cost
+
+    @property
+    def over_hard_budget(self) -> bool:
+        with self._lock:
+            return self.hard_budget is not None and self.total_cost >= self.hard_budget
+
+    def admit_work(self):
+        """
+        Call before scheduling a new unit of work. Raises BudgetExceeded past the hard budget
+        and sleeps past the soft budget.
+        """
+        with self._lock:
+            spent = self.total_cost
+            warn = self.soft_budget is not None and spent >= self.soft_budget and not self._soft_warned
+            if warn:
+                self._soft_warned = True
+        if self.hard_budget is not None and spent >= self.hard_budget:
+            raise BudgetExceeded(f"Hard budget of ${self.hard_budget:.2f} reached (spent ${spent:.2f})")
+        if self.soft_budget is not None and spent >= self.soft_budget:
+            if warn:
+                logger.warning(f"Soft budget of ${self.soft_budget:.2f} reached (spent ${spent:.2f}); throttling")
+            time.sleep(self.throttle_seconds)
+
+    def totals_by(self, dimension: str) -> Dict[str, Dict[str, Any]]:
+        """Aggregate cost, calls and token usage by "model", "phase", "skill" or "subject"."""
+        index = ("model", "phase", "skill", "subject").index(dimension)
+        totals: Dict[str, Dict[str, Any]] = {}
+        with self._lock:
+            for key, entry in self.entries.items():
+                total = totals.setdefault(key[index], {"usage": Usage(), "cost": 0.0, "calls": 0})
+                total["usage"] = total["usage"] + entry["usage"]
+                total["cost"] += entry["cost"]
+                total["calls"] += entry["calls"]
+        return totals
+
+    def cost_per_point(self, skill_summary: Dict[str, Dict[str, float]],
+                       model_costs: Optional[Dict[str, float]] = None) -> Dict[str, Optional[float]]:
+        """
+        Cost of evaluating each local model (its answers plus their grading) divided by its
+        mean score across skills, from aggregator.summarize_scores output.
+        The ledger only knows what this run spent, so when the scores include stored cells
+        pass model_costs, the cost of every scored cell per model (ResultsStore.collect_costs).
+        """
+        if model_costs is None:
+            model_costs = {name: total["cost"] for name, total in self.totals_by("subject").items()}
+        result: Dict[str, Optional[float]] = {}
+        for model_name, skill_dict in skill_summary.items():
+            averages = [score for score in skill_dict.values() if score is not None]
+            mean_score = sum(averages) / len(averages) if averages else 0.0
+            cost = model_costs.get(model_name, 0.0)
+            result[model_name] = cost / mean_score if mean_score > 0 else None
+        return result
+
+    def report(self, skill_summary: Optional[Dict[str, Dict[str, float]]] = None,
+               model_costs: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+        def flatten(totals):
+            return {name: {"cost": t["cost"], "calls": t["calls"], **t["usage"].to_dict()} for name, t in totals.items()}
+
+        report = {
+            "total_cost": self.total_cost,
+            "soft_budget": self.soft_budget,
+            "hard_budget": self.hard_budget,
+            "by_model": flatten(self.totals_by("model")),
+            "by_phase": flatten(self.totals_by("phase")),
+            "by_skill": flatten(self.totals_by("skill")),
+        }
+        if skill_summary is not None:
+            report["cost_per_point"] = self.cost_per_point(skill_summary, model_costs)
+        return report
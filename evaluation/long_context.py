@@ -0,0 +1,76 @@
+import logging
+import time
+from typing import Any, Dict, List, Optional
+
+from clients.resilience import ModelCallError
+from evaluation import grader
+from evaluation.cost_ledger import charge_context
+from models.chunked import ChunkedModel
+from prompts.skill_prompts import SYSTEM_GRADE_ANSWER_PROMPT
+from skill_tests.skill_test import SkillTest
+
+logger = logging.getLogger("LongContextComparison")
+
+
+def _timed_cell(model, remote_model, test: SkillTest) -> Dict[str, Any]:
+    """Answer and grade one test like runner.evaluate_cell, timing the answer only."""
+    grader_messages = [{"role": "system", "content": SYSTEM_GRADE_ANSWER_PROMPT}]
+    with charge_context(subject=model.name, skill=test.skill):
+        start = time.monotonic()
+        with charge_context(phase="answer"):
+            answer = model.run_test(test)
+        latency = time.monotonic() - start
+        with charge_context(phase="grade"):
+            score = grader.grade_answer(remote_model, grader_messages, test, answer)
+    return {"latency": latency, "score": score}
+
+
+def _summarize_mode(results: List[Dict[str, Any]], failures: int) -> Dict[str, Any]:
+    return {
+        "completed": len(results),
+        "failures": failures,
+        "mean_latency": sum(r["latency"] for r in results) / len(results) if results else None,
+        "mean_score": sum(r["score"] for r in results) / len(results) if results else None,
+    }
+
+
+def compare_chunked(local_models, remote_model, skill_tests: List[SkillTest],
+                    chunked_models: Optional[List[ChunkedModel]] = None, **chunk_kwargs) -> Dict[str, Dict[str, Any]]:
+    """
+    Run every long-context test (context above the chunk size) through both the single-shot
+    and the chunked path of each local model, grade both answers with the remote model and
+    report answer latency and score per path.
+    chunked_models wraps local_models one to one; if not given they are built from chunk_kwargs
+    (see ChunkedModel). A failed call counts as a failure of its path rather than a low score.
+    Returns {model_name: {"tests", "single_shot", "chunked", "score_delta", "speedup", ...}}.
+    """
+    if chunked_models is None:
+        chunked_models = [ChunkedModel(model, **chunk_kwargs) for model in local_models]
+
+    report: Dict[str, Dict[str, Any]] = {}
+    for model, chunked in zip(local_models, chunked_models):
+        long_tests = [test for test in skill_tests if chunked.needs_chunking(test)]
+        logger.info(f"Comparing single-shot and chunked answers of {model.name} on {len(long_tests)} long-context tests")
+        paths = {"single_shot": model, "chunked": chunked}
+        results: Dict[str, List[Dict[str, Any]]] = {path: [] for path in paths}
+        failures = {path: 0 for path in paths}
+        for test in long_tests:
+            for path, runner_model in paths.items():
+                try:
+                    results[path].append(_timed_cell(runner_model, remote_model, test))
+                except ModelCallError as e:
+                    logger.error(f"{path} answer of {model.name} on {test.skill} failed: {e}")
+                    failures[path] += 1
+
+        single = _summarize_mode(results["single_shot"], failures["single_shot"])
+        chunk = _summarize_mode(results["chunked"], failures["chunked"])
+        chunk.update({"chunk_calls": chunked.chunk_calls, "chunk_cache_hits": chunked.cache_hits})
+        both = single["mean_score"] is not None and chunk["mean_score"] is not None
+        report[model.name] = {
+            "tests": len(long_tests),
+            "single_shot": single,
+            "chunked": chunk,
+            "score_delta": chunk["mean_score"] - single["mean_score"] if both else None,
+            "speedup": single["mean_latency"] / chunk["mean_latency"] if both and chunk["mean_latency"] else None,
+        }
+    return report
@@ -0,0 +1,174 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from prompts import skill_prompts
+from skill_tests.skill_test import SkillTest
+
+logger = logging.getLogger("ResultsStore")
+
+
+def _hash(*parts: Any) -> str:
+    """Stable short hash of a sequence of JSON-serializable parts."""
+    payload = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def model_fingerprint(model) -> str:
+    """
+    Fingerprint of everything that changes a local model's answers.
+    The display name is deliberately excluded so renaming a model keeps its results.
+    """
+    client = model.client
+    return _hash(
+        getattr(model, "model_type", "openai"),
+        client.model_name,
+        client.temperature,
+        client.max_tokens,
+        getattr(client, "num_ctx", None),
+    )
+
+
+def cell_model_fingerprint(model, test: SkillTest, model_fp: str) -> str:
+    """
+    Fingerprint of a model for one test. A chunked model (models.chunked) only answers
+    differently from the model it wraps on the tests it chunks, so only those cells
+    depend on its chunking settings.
+    """
+    needs_chunking = getattr(model, "needs_chunking", None)
+    if needs_chunking is not None and needs_chunking(test):
+        return _hash(model_fp, model.chunking)
+    return model_fp
+
+
+def grader_fingerprint(remote_model) -> str:
+    """Fingerprint of the remote model configuration used for grading."""
+    client = remote_model.client
+    return _hash(client.model_name, client.temperature, client.max_tokens)
+
+
+def test_fingerprint(test: SkillTest) -> str:
+    """Hash of the content of a skill test."""
+    return _hash(test.skill, test.context, test.question, test.expected)
+
+
+def _answer_user_template(test: SkillTest) -> str:
+    if test.context:
+        return skill_prompts.USER_LOCAL_SKILL_CONTEXT_PROMPT
+    return skill_prompts.USER_LOCAL_SKILL_NO_CONTEXT_PROMPT
+
+
+def answer_prompt_fingerprint(test: SkillTest) -> str:
+    """Hash of the prompt templates a test's answer goes through, without the grading prompts."""
+    return _hash(skill_prompts.SYSTEM_TEST_LOCAL_MODEL_SKILL, _answer_user_template(test))
+
+
+def prompt_fingerprint(test: SkillTest) -> str:
+    """
+    Hash of the prompt templates that a test actually goes through.
+    Tests with a context use a different user template than tests without one, so editing
+    one of them only invalidates the cells that use it.
+    """
+    return _hash(
+        skill_prompts.SYSTEM_TEST_LOCAL_MODEL_SKILL,
+        _answer_user_template(test),
+        skill_prompts.SYSTEM_GRADE_ANSWER_PROMPT,
+        skill_prompts.USER_GRADE_ANSWER_PROMPT,
+    )
+
+
+def cell_key(model, model_fp: str, test: SkillTest, grader_fp: str) -> str:
+    """Key of one cell of the model x test matrix."""
+    return "/".join([cell_model_fingerprint(model, test, model_fp), test_fingerprint(test),
+                     prompt_fingerprint(test), grader_fp])
+
+
+class ResultsStore:
+    """
+    Persistent store of graded answers, one JSON record per line.
+    Records are appended as soon as they are produced, so an interrupted run keeps
+    everything it finished. When a key appears more than once the last record wins.
+    Writes are serialized, so one store can be shared by concurrently evaluated models.
+    """
+    def __init__(self, path: str = "results_store.jsonl"):
+        self.path = path
+        self.records: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            self._load()
+
+    def _load(self):
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line_no, line in enumerate(f, start=1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # A run killed mid-write can leave a truncated last line
+                    logger.warning(f"Skipping malformed line {line_no} in {self.path}")
+                    continue
+                self.records[record["key"]] = record
+        logger.info(f"Loaded {len(self.records)} stored results from {self.path}")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        return self.records.get(key)
+
+    def put(self, key: str, record: Dict[str, Any]):
+        record = dict(record, key=key)
+        line = json.dumps(record) + "\n"
+        with self._lock:
+            self.records[key] = record
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+
+    def missing_cells(self, local_models, skill_tests: Iterable[SkillTest], remote_model) -> List[Tuple[Any, SkillTest, str]]:
+        """
+        Return the (model, test, key) cells of the model x test matrix that have no stored result.
+        """
+        grader_fp = grader_fingerprint(remote_model)
+        model_fps = [(model, model_fingerprint(model)) for model in local_models]
+        missing = []
+        # Test-major order; runner.order_cells regroups the Ollama models
+        for test in skill_tests:
+            for model, model_fp in model_fps:
+                key = cell_key(model, model_fp, test, grader_fp)
+                if key not in self.records:
+                    missing.append((model, test, key))
+        return missing
+
+    def collect_scores(self, local_models, skill_tests: Iterable[SkillTest], remote_model) -> Dict[str, Dict[str, List[int]]]:
+        """
+        Build the scores[model_name][skill] = [scores...] structure for the current matrix
+        from stored results. Results for models or tests outside the matrix are ignored.
+        """
+        grader_fp = grader_fingerprint(remote_model)
+        skill_tests = list(skill_tests)
+        scores: Dict[str, Dict[str, List[int]]] = {}
+        for model in local_models:
+            model_fp = model_fingerprint(model)
+            scores[model.name] = {}
+            for test in skill_tests:
+                record = self.records.get(cell_key(model, model_fp, test, grader_fp))
+                if record is not None:
+                    scores[model.name].setdefault(test.skill, []).append(record["score"])
+        return scores
+
+    def collect_costs(self, local_models, skill_tests: Iterable[SkillTest], remote_model) -> Dict[str, float]:
+        """
+        Total stored cost of the current matrix per model, i.e. what evaluating every scored
+        cell cost when it was evaluated (records without a cost count as free).
+        """
+        grader_fp = grader_fingerprint(remote_model)
+        skill_tests = list(skill_tests)
+        costs: Dict[str, float] = {}
+        for model in local_models:
+            model_fp = model_fingerprint(model)
+            costs[model.name] = sum(self.records[key].get("cost", 0.0)
+                                    for key in (cell_key(model, model_fp, test, grader_fp) for test in skill_tests)
+                                    if key in self.records)
+        return costs
@@ -0,0 +1,138 @@
+import logging
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from clients.resilience import ModelCallError
+from evaluation import grader
+from evaluation.cost_ledger import BudgetExceeded, CostLedger, charge_context, metered
+from evaluation.results_store import ResultsStore
+from evaluation.streaming import StreamingAggregator
+from prompts.skill_prompts import SYSTEM_GRADE_ANSWER_PROMPT
+from skill_tests.skill_test import SkillTest
+
+logger = logging.getLogger("SkillEvaluationRunner")
+
+
+def evaluate_cell(model, remote_model, test: SkillTest) -> Tuple[str, int]:
+    """
+    Run one local model on one skill test and grade the answer with the remote model.
+    Each cell gets its own grader conversation so that its score does not depend on
+    which other cells were evaluated in the same run.
+    """
+    grader_messages = [{"role": "system", "content": SYSTEM_GRADE_ANSWER_PROMPT}]
+    with charge_context(subject=model.name, skill=test.skill):
+        with charge_context(phase="answer"):
+            answer = model.run_test(test)
+        logger.info(f"{model.name} -> Task: {test.skill} | Question: {test.question} | Answer: {answer}")
+        with charge_context(phase="grade"):
+            score = grader.grade_answer(remote_model, grader_messages, test, answer)
+    logger.info(f"Graded score for {model.name} on {test.skill}: {score}/10")
+    return answer, score
+
+
+def order_cells(cells: List[Tuple]) -> List[Tuple]:
+    """
+    Order (model, test, key) cells for a sequential run.
+    Ollama models are evaluated model by model, since a host swaps the loaded model
+    whenever consecutive calls name different models. Other models keep the incoming
+    test-major order. The two streams are merged in proportion to their lengths, so every
+    model keeps accumulating scores throughout the run; calls to other backends between two
+    Ollama calls do not evict the loaded model.
+    """
+    ollama = [cell for cell in cells if getattr(cell[0], "model_type", None) == "ollama"]
+    others = [cell for cell in cells if getattr(cell[0], "model_type", None) != "ollama"]
+    model_order = {}
+    for cell in ollama:
+        model_order.setdefault(id(cell[0]), len(model_order))
+    ollama.sort(key=lambda cell: model_order[id(cell[0])])  # stable, so test order is kept
+
+    ordered = []
+    i = j = 0
+    while i < len(ollama) or j < len(others):
+        # Take from the stream that is further behind, relative to its length
+        if j >= len(others) or (i < len(ollama) and i * len(others) <= j * len(ollama)):
+            ordered.append(ollama[i])
+            i += 1
+        else:
+            ordered.append(others[j])
+            j += 1
+    return ordered
+
+
+def run_evaluation(local_models, remote_model, skill_tests: List[SkillTest],
+                   store: Optional[ResultsStore] = None,
+                   tracker: Optional[StreamingAggregator] = None,
+                   stop_when_settled: bool = False,
+                   ledger: Optional[CostLedger] = None) -> Dict[str, Dict[str, List[int]]]:
+    """
+    Evaluate every local model on every skill test.
+    With a results store, only the cells missing from the store are evaluated and the
+    returned scores are the merge of new and stored results.
+    With a tracker, every graded answer (and every failed cell) is streamed into it so a
+    progress view can follow the run. stop_when_settled ends the run as soon as the
+    tracker reports a settled ranking for every skill.
+    With a ledger, each new cell must be admitted by its budget: past the soft budget
+    scheduling is throttled, past the hard budget no further cells are started.
+    Interrupting the run with Ctrl-C returns the scores of the cells finished so far.
+    Returns scores[model_name][skill] = [scores...].
+    """
+    if store is None:
+        cells = [(model, test, None) for test in skill_tests for model in local_models]
+    else:
+        cells = store.missing_cells(local_models, skill_tests, remote_model)
+        total = len(local_models) * len(skill_tests)
+        logger.info(f"{total - len(cells)}/{total} cells found in {store.path}; evaluating {len(cells)}.")
+        if tracker is not None:
+            for model_name, skill_dict in store.collect_scores(local_models, skill_tests, remote_model).items():
+                for skill, score_list in skill_dict.items():
+                    for score in score_list:
+                        tracker.update(model_name, skill, score, fresh=False)
+    cells = order_cells(cells)
+    if tracker is not None:
+        tracker.total = len(cells)
+        tracker.expect([model.name for model in local_models], {test.skill for test in skill_tests})
+
+    scores = {model.name: defaultdict(list) for model in local_models}
+    last_settled_check = time.monotonic()
+    try:
+        for model, test, key in cells:
+            if ledger is not None:
+                try:
+                    ledger.admit_work()
+                except BudgetExceeded as e:
+                    logger.warning(f"{e}; not scheduling the remaining cells.")
+                    break
+            try:
+                with metered() as meter:
+                    answer, score = evaluate_cell(model, remote_model, test)
+            except ModelCallError as e:
+                logger.error(f"Evaluation of {model.name} on {test.skill} failed and is excluded from the results: {e}")
+                if tracker is not None:
+                    tracker.record_error(model.name, test.skill)
+                continue
+
+            scores[model.name][test.skill].append(score)
+            if store is not None:
+                store.put(key, {
+                    "model": model.name,
+                    "skill": test.skill,
+                    "question": test.question,
+                    "answer": answer,
+                    "score": score,
+                    "cost": meter.cost,
+                })
+            if tracker is not None:
+                tracker.update(model.name, test.skill, score)
+                # The settled check walks every cell, so run it at most once per second
+                if stop_when_settled and time.monotonic() - last_settled_check >= 1.0:
+                    last_settled_check = time.monotonic()
+                    if tracker.all_settled():
+                        logger.info("Ranking settled for every skill; stopping early.")
+                        break
+    except KeyboardInterrupt:
+        logger.warning("Interrupted; summarizing the cells finished so far.")
+
+    if store is not None:
+        return store.collect_scores(local_models, skill_tests, remote_model)
+    return scores
@@ -0,0 +1,220 @@
+import math
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+
+class RunningStats:
+    """
+    Running count, mean and variance (Welford's algorithm), O(1) memory.
+    """
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def add(self, x: float):
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (x - self.mean)
+
+    @property
+    def variance(self) -> float:
+        return self._m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std_error(self) -> float:
+        return math.sqrt(self.variance / self.count) if self.count > 1 else float("inf")
+
+
+class P2Quantile:
+    """
+    Streaming estimate of one quantile with the P-square algorithm (Jain & Chlamtac, 1985).
+    Keeps five markers regardless of how many values are added.
+    """
+    def __init__(self, p: float):
+        self.p = p
+        self.count = 0
+        self.heights: List[float] = []
+        self.positions = [1, 2, 3, 4, 5]
+        self.desired = [1, 1 + 2 * p, 1 + 4 * p, 3 + 2 * p, 5]
+        self.increments = [0, p / 2, p, (1 + p) / 2, 1]
+
+    def add(self, x: float):
+        self.count += 1
+        q = self.heights
+        if len(q) < 5:
+            q.append(x)
+            q.sort()
+            return
+
+        if x < q[0]:
+            q[0] = x
+            k = 0
+        elif x >= q[4]:
+            q[4] = x
+            k = 3
+        else:
+            k = next(i for i in range(1, 5) if x < q[i]) - 1
+
+        n = self.positions
+        for i in range(k + 1, 5):
+            n[i] += 1
+        for i in range(5):
+            self.desired[i] += self.increments[i]
+
+        # Move the three middle markers towards their desired positions
+        for i in range(1, 4):
+            d = self.desired[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                d = 1 if d > 0 else -1
+                parabolic = q[i] + d / (n[i + 1] - n[i - 1]) * (
+                    (n[i] - n[i - 1] + d) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+                    + (n[i + 1] - n[i] - d) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+                )
+                if q[i - 1] < parabolic < q[i + 1]:
+                    q[i] = parabolic
+                else:
+                    q[i] = q[i] + d * (q[i + d] - q[i]) / (n[i + d] - n[i])
+                n[i] += d
+
+    @property
+    def value(self) -> Optional[float]:
+        q = self.heights
+        if not q:
+            return None
+        if self.count > 5:
+            return q[2]
+        # Up to five values the markers are the sorted sample itself: interpolate directly
+        pos = self.p * (len(q) - 1)
+        lower = int(math.floor(pos))
+        upper = min(lower + 1, len(q) - 1)
+        return q[lower] + (q[upper] - q[lower]) * (pos - lower)
+
+
+class CellStats:
+    """Running mean and quantiles for one (model, skill) cell."""
+    def __init__(self, levels: Sequence[float]):
+        self.stats = RunningStats()
+        self.quantiles = {level: P2Quantile(level) for level in levels}
+
+    def add(self, score: float):
+        self.stats.add(score)
+        for estimator in self.quantiles.values():
+            estimator.add(score)
+
+
+class StreamingAggregator:
+    """
+    Thread-safe running summary of a run, updated after every graded answer.
+    Tracks per (model, skill) mean and quantiles plus run-level throughput and error counts,
+    so progress views can read a consistent snapshot while the evaluation loop keeps going.
+    """
+    def __init__(self, total: int = 0, levels: Sequence[float] = (0.25, 0.5, 0.75)):
+        self.total = total
+        self.levels = tuple(levels)
+        self.cells: Dict[Tuple[str, str], CellStats] = {}
+        self.completed = 0
+        self.errors = 0
+        self.start_time = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _cell(self, model: str, skill: str) -> CellStats:
+        cell = self.cells.get((model, skill))
+        if cell is None:
+            cell = self.cells[(model, skill)] = CellStats(self.levels)
+        return cell
+
+    def expect(self, models: Iterable[str], skills: Iterable[str]):
+        """
+        Register every (model, skill) cell of the run up front, so models that have not
+        produced a score yet still count when deciding whether rankings are settled.
+        """
+        skills = list(skills)
+        with self._lock:
+            for model in models:
+                for skill in skills:
+                    self._cell(model, skill)
+
+    def update(self, model: str, skill: str, score: float, fresh: bool = True):
+        """
+        Add one graded score. Scores loaded from a results store are passed with fresh=False:
+        they feed the leaderboard but not the throughput and ETA.
+        """
+        with self._lock:
+            self._cell(model, skill).add(score)
+            if fresh:
+                self.completed += 1
+
+    def record_error(self, model: str, skill: str):
+        with self._lock:
+            self._cell(model, skill)
+            self.errors += 1
+
+    def snapshot(self) -> Dict:
+        """Consistent copy of the run counters and per-cell summaries."""
+        with self._lock:
+            elapsed = time.monotonic() - self.start_time
+            attempted = self.completed + self.errors
+            cells = {
+                key: {
+                    "count": cell.stats.count,
+                    "mean": cell.stats.mean,
+                    "std_error": cell.stats.std_error,
+                    "quantiles": {level: est.value for level, est in cell.quantiles.items()},
+                }
+                for key, cell in self.cells.items()
+            }
+            completed, errors = self.completed, self.errors
+        rate = attempted / elapsed if elapsed > 0 else 0.0
+        remaining = max(self.total - attempted, 0)
+        return {
+            "completed": completed,
+            "errors": errors,
+            "total": self.total,
+            "elapsed": elapsed,
+            "throughput_per_min": rate * 60,
+            "eta_seconds": remaining / rate if rate > 0 else None,
+            "error_rate": errors / attempted if attempted else 0.0,
+            "cells": cells,
+        }
+
+    def leaderboard(self, snapshot: Optional[Dict] = None) -> Dict[str, List[Tuple[str, float, float, int]]]:
+        """
+        Per-skill ranking of models by running mean.
+        Returns { skill: [(model, mean, std_error, count), ...] } sorted best first.
+        """
+        snapshot = snapshot or self.snapshot()
+        board: Dict[str, List[Tuple[str, float, float, int]]] = {}
+        for (model, skill), cell in snapshot["cells"].items():
+            if cell["count"] > 0:
+                board.setdefault(skill, []).append((model, cell["mean"], cell["std_error"], cell["count"]))
+        for entries in board.values():
+            entries.sort(key=lambda e: e[1], reverse=True)
+        return board
+
+    @staticmethod
+    def ranking_settled(entries: List[Tuple[str, float, float, int]], z: float = 2.0, min_count: int = 5) -> bool:
+        """
+        True when every pair of adjacent models in a skill ranking is separated by more than
+        z combined standard errors and each model has at least min_count scores.
+        """
+        if len(entries) < 2 or any(count < min_count for _, _, _, count in entries):
+            return False
+        for (_, mean_a, se_a, _), (_, mean_b, se_b, _) in zip(entries, entries[1:]):
+            if mean_a - mean_b <= z * math.sqrt(se_a ** 2 + se_b ** 2):
+                return False
+        return True
+
+    def all_settled(self, z: float = 2.0, min_count: int = 5) -> bool:
+        """
+        True when every skill's ranking is settled. Unlike the leaderboard this includes
+        registered cells without scores, so a model that has not run yet keeps it False.
+        """
+        board: Dict[str, List[Tuple[str, float, float, int]]] = {}
+        for (model, skill), cell in self.snapshot()["cells"].items():
+            board.setdefault(skill, []).append((model, cell["mean"], cell["std_error"], cell["count"]))
+        for entries in board.values():
+            entries.sort(key=lambda e: e[1], reverse=True)
+        return bool(board) and all(self.ranking_settled(e, z, min_count) for e in board.values())
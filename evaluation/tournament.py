@@ -0,0 +1,267 @@
+import logging
+import math
+import random
+import re
+import string
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from clients.resilience import ModelCallError
+from evaluation.cost_ledger import BudgetExceeded, CostLedger, charge_context
+from evaluation.results_store import (ResultsStore, _hash, answer_prompt_fingerprint, cell_model_fingerprint,
+                                      grader_fingerprint, model_fingerprint, test_fingerprint)
+from prompts.skill_prompts import SYSTEM_RANK_ANSWERS_PROMPT, USER_RANK_ANSWERS_PROMPT
+from skill_tests.skill_test import SkillTest
+
+logger = logging.getLogger("TournamentGrader")
+
+LABELS = string.ascii_uppercase
+
+# A chain of answer labels joined by ">" or "=", e.g. "C > A = D > B"
+_RANKING_CHAIN = re.compile(r"[A-Z](?:\s*[>=]\s*[A-Z](?![A-Za-z]))*(?![A-Za-z])")
+
+
+def parse_ranking(text: str, num_answers: int) -> List[List[int]]:
+    """
+    Parse a ranking such as "Ranking: C > A = D > B" into tiers of answer indices, best
+    first. Only the first line after the last "Ranking:" is read, and only its leading run
+    of letters joined by ">" or "="; without a "Ranking:" marker, the first line starting
+    with such a chain of at least two letters is used. Letters the grader left out are
+    appended as one tied last tier. Raises ValueError when no ranking can be found.
+    """
+    lower = text.lower()
+    if "ranking:" in lower:
+        rest = text[lower.rindex("ranking:") + len("ranking:"):].strip()
+        candidates = rest.splitlines()[:1]
+        min_labels = 1
+    else:
+        candidates = text.splitlines()
+        min_labels = 2
+    chain = None
+    for line in candidates:
+        match = _RANKING_CHAIN.match(line.strip().strip("*`").strip())
+        if match and len(re.findall(r"[A-Z]", match.group(0))) >= min_labels:
+            chain = match.group(0)
+            break
+    if chain is None:
+        raise ValueError(f"Could not parse a ranking from grader output: {text!r}")
+
+    tiers: List[List[int]] = []
+    seen = set()
+    for part in chain.split(">"):
+        tier = []
+        for label in re.findall(r"[A-Z]", part):
+            index = LABELS.index(label)
+            if index < num_answers and index not in seen:
+                seen.add(index)
+                tier.append(index)
+        if tier:
+            tiers.append(tier)
+    if not tiers:
+        raise ValueError(f"Grader ranking names no valid answer: {chain!r}")
+    missing = [i for i in range(num_answers) if i not in seen]
+    if missing:
+        logger.warning(f"Grader ranking omitted {len(missing)} answers; ranking them last")
+        tiers.append(missing)
+    return tiers
+
+
+def rank_answers(remote_model, test: SkillTest, answers: Sequence[str]) -> List[List[int]]:
+    """
+    Ask the remote model to rank several answers to one test in a single call.
+    Returns tiers of indices into `answers`, best first.
+    """
+    if len(answers) > len(LABELS):
+        raise ValueError(f"At most {len(LABELS)} answers can be ranked in one call")
+    context_part = f"Context:\n{test.context}\n" if test.context else ""
+    expected_part = f"Expected answer: {test.expected}\n" if test.expected else ""
+    answers_part = "\n".join(f"Answer {LABELS[i]}: {answer}" for i, answer in enumerate(answers))
+    ranking_prompt = USER_RANK_ANSWERS_PROMPT.format(question=test.question, context=context_part,
+                                                     expected_answer=expected_part, answers=answers_part)
+    grader_messages = [
+        {"role": "system", "content": SYSTEM_RANK_ANSWERS_PROMPT},
+        {"role": "user", "content": ranking_prompt},
+    ]
+    return parse_ranking(remote_model.generate_response(grader_messages).strip(), len(answers))
+
+
+def pairwise_wins(ranks: np.ndarray, batch_size: int = 1024) -> np.ndarray:
+    """
+    Turn a (num_rankings, num_models) array of rank positions (lower is better, NaN for
+    models not in a ranking) into a (num_models, num_models) matrix where wins[i, j] counts
+    how often model i was ranked above model j. A tie counts as half a win for both.
+    """
+    num_models = ranks.shape[1]
+    wins = np.zeros((num_models, num_models))
+    off_diagonal = ~np.eye(num_models, dtype=bool)
+    for start in range(0, len(ranks), batch_size):
+        batch = ranks[start:start + batch_size]
+        left, right = batch[:, :, None], batch[:, None, :]
+        # Comparisons involving NaN are False, so absent models neither win nor lose
+        wins += (left < right).sum(axis=0)
+        wins += 0.5 * ((left == right) & off_diagonal).sum(axis=0)
+    return wins
+
+
+def fit_bradley_terry(wins: np.ndarray, prior: float = 0.5, max_iter: int = 1000, tol: float = 1e-8) -> np.ndarray:
+    """
+    Fit Bradley-Terry strengths to win matrices of shape (..., num_models, num_models) with
+    the MM algorithm (Hunter, 2004), all leading dimensions (e.g. skills) at once.
+    `prior` adds that many virtual wins to every pair, which keeps the strengths of models
+    that never lost (or never won) finite. Strengths are normalized to a geometric mean of 1.
+    """
+    wins = np.asarray(wins, dtype=float)
+    num_models = wins.shape[-1]
+    wins = wins + prior * (1 - np.eye(num_models))
+    games = wins + np.swapaxes(wins, -1, -2)
+    total_wins = wins.sum(axis=-1)
+    strengths = np.ones(wins.shape[:-1])
+    for _ in range(max_iter):
+        denominator = (games / (strengths[..., :, None] + strengths[..., None, :])).sum(axis=-1)
+        updated = total_wins / denominator
+        updated /= np.exp(np.log(updated).mean(axis=-1, keepdims=True))
+        converged = np.max(np.abs(np.log(updated) - np.log(strengths))) < tol
+        strengths = updated
+        if converged:
+            break
+    return strengths
+
+
+def strengths_to_elo(strengths: np.ndarray, base: float = 1500.0) -> np.ndarray:
+    """Express Bradley-Terry strengths on the Elo scale (400 points = 10:1 odds)."""
+    return base + 400.0 * np.log10(strengths)
+
+
+@dataclass
+class TournamentResult:
+    """
+    Ratings from comparative grading.
+    ratings[s, m] is the Elo rating of model m on skill s (NaN if it was never compared);
+    wins[s, i, j] counts how often model i was ranked above model j on skill s.
+    """
+    models: List[str]
+    skills: List[str]
+    wins: np.ndarray       # shape (num_skills, num_models, num_models)
+    ratings: np.ndarray    # shape (num_skills, num_models)
+    rankings: int          # number of grader rankings the ratings are fitted on
+    grader_calls: int      # grader calls made in this run (stored rankings are not counted)
+
+    def as_summary(self) -> Dict[str, Dict[str, Optional[float]]]:
+        """Ratings in the { model_name: { skill: rating } } shape of aggregator.summarize_scores."""
+        return {
+            model: {skill: None if np.isnan(self.ratings[s, m]) else float(self.ratings[s, m])
+                    for s, skill in enumerate(self.skills)}
+            for m, model in enumerate(self.models)
+        }
+
+
+def ranking_key(model_fps: Sequence[str], test: SkillTest, grader_fp: str) -> str:
+    """Key of one grader ranking: the group of models, the test, the answer and ranking prompts and the grader."""
+    return _hash("tournament", sorted(model_fps), test_fingerprint(test), answer_prompt_fingerprint(test),
+                 SYSTEM_RANK_ANSWERS_PROMPT, USER_RANK_ANSWERS_PROMPT, grader_fp)
+
+
+def run_tournament(local_models, remote_model, skill_tests: List[SkillTest],
+                   store: Optional[ResultsStore] = None,
+                   ledger: Optional[CostLedger] = None,
+                   group_size: int = 8,
+                   prior: float = 0.5) -> TournamentResult:
+    """
+    Comparative grading: for every test, all local models answer and the remote model ranks
+    the answers in one call, so grader calls scale with the number of tests instead of
+    models x tests. With more than group_size models, each test is ranked in near-equal
+    groups of at most group_size models (but at least two), regrouped per test so every
+    pair of models meets across tests.
+    Answers are shown in a per-test shuffled order to average out position bias.
+    Rankings are turned into pairwise wins and fitted to Bradley-Terry ratings per skill,
+    reported on the Elo scale. A model whose answer fails is left out of that ranking.
+    With a store, rankings are persisted and re-used for the same models, test and grader.
+    """
+    model_fps = [model_fingerprint(model) for model in local_models]
+    grader_fp = grader_fingerprint(remote_model)
+    skills = sorted({test.skill for test in skill_tests})
+    skill_index = {skill: s for s, skill in enumerate(skills)}
+    rank_rows: List[np.ndarray] = []
+    row_skills: List[int] = []
+    grader_calls = 0
+
+    try:
+        for test in skill_tests:
+            # Deterministic per-test shuffle, so re-runs form the same groups and hit the store
+            order = list(range(len(local_models)))
+            random.Random(test_fingerprint(test)).shuffle(order)
+            test_fps = [cell_model_fingerprint(model, test, fp) for model, fp in zip(local_models, model_fps)]
+            for group in _split_groups(order, group_size):
+                if len(group) < 2:
+                    continue
+                key = ranking_key([test_fps[m] for m in group], test, grader_fp)
+                record = store.get(key) if store is not None else None
+                if record is None:
+                    if ledger is not None:
+                        ledger.admit_work()
+                    record = _rank_group(local_models, remote_model, test, group, test_fps)
+                    if record is None:
+                        continue
+                    grader_calls += 1
+                    if store is not None:
+                        store.put(key, record)
+                row = np.full(len(local_models), np.nan)
+                for m in group:
+                    if test_fps[m] in record["ranks"]:
+                        row[m] = record["ranks"][test_fps[m]]
+                rank_rows.append(row)
+                row_skills.append(skill_index[test.skill])
+    except BudgetExceeded as e:
+        logger.warning(f"{e}; not ranking the remaining tests.")
+    except KeyboardInterrupt:
+        logger.warning("Interrupted; fitting ratings on the rankings finished so far.")
+
+    ranks = np.array(rank_rows).reshape(len(rank_rows), len(local_models))
+    row_skills = np.array(row_skills, dtype=int)
+    wins = np.stack([pairwise_wins(ranks[row_skills == s]) for s in range(len(skills))]) if skills \
+        else np.zeros((0, len(local_models), len(local_models)))
+    ratings = strengths_to_elo(fit_bradley_terry(wins, prior=prior))
+    # Models never compared on a skill only carry the prior; report them as unrated
+    compared = (wins + np.swapaxes(wins, -1, -2)).sum(axis=-1) > 0
+    ratings = np.where(compared, ratings, np.nan)
+    return TournamentResult(models=[model.name for model in local_models], skills=skills, wins=wins,
+                            ratings=ratings, rankings=len(rank_rows), grader_calls=grader_calls)
+
+
+def _split_groups(order: List[int], group_size: int) -> List[List[int]]:
+    """
+    Split models into the fewest near-equal groups of at most group_size, never leaving a
+    group of one (a group of one model cannot be ranked). With group_size 2 and an odd
+    number of models, one group therefore has three.
+    """
+    num_groups = max(1, min(math.ceil(len(order) / group_size), len(order) // 2))
+    return [group.tolist() for group in np.array_split(np.array(order, dtype=int), num_groups)]
+
+
+def _rank_group(local_models, remote_model, test: SkillTest, group: List[int], model_fps: List[str]) -> Optional[dict]:
+    """Answer a test with every model of a group and rank the answers. None if fewer than two answered."""
+    answered, answers = [], []
+    for m in group:
+        model = local_models[m]
+        try:
+            with charge_context(subject=model.name, skill=test.skill, phase="answer"):
+                answers.append(model.run_test(test))
+            answered.append(m)
+        except ModelCallError as e:
+            logger.error(f"Answer of {model.name} on {test.skill} failed and is left out of the ranking: {e}")
+    if len(answered) < 2:
+        return None
+
+    try:
+        with charge_context(skill=test.skill, phase="grade"):
+            tiers = rank_answers(remote_model, test, answers)
+    except (ModelCallError, ValueError) as e:
+        logger.error(f"Ranking of the answers on {test.skill} failed: {e}")
+        return None
+    ranks = {model_fps[answered[i]]: position for position, tier in enumerate(tiers) for i in tier}
+    logger.info(f"Ranked {len(answered)} answers on {test.skill}: "
+                + " > ".join(" = ".join(local_models[answered[i]].name for i in tier) for tier in tiers))
+    return {"skill": test.skill, "question": test.question, "ranks": ranks,
+            "answers": {local_models[m].name: answer for m, answer in zip(answered, answers)}}
@@ -0,0 +1,120 @@
+import argparse
+import json
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+from clients.resilience import ModelCallError, RetryPolicy, total_backoff_seconds
+from mock_server.server import MockConfig, start_in_thread
+from skill_tests.static_tests import STATIC_SKILL_TESTS
+
+
+def _percentile(sorted_values: List[float], p: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(int(round(p * (len(sorted_values) - 1))), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+def build_target(target: str, retry_policy: RetryPolicy):
+    """Build the model under test. Clients pick up the mock server from the environment."""
+    from models.local_model import LocalModel
+    from models.remote_model import RemoteModel
+
+    if target == "remote":
+        return RemoteModel(name="mock-remote", model_name="mock-gpt", retry_policy=retry_policy)
+    model_type = "ollama" if target == "local-ollama" else "openai"
+    return LocalModel(name=f"mock-{model_type}", model_type=model_type, model_name="mock",
+                      retry_policy=retry_policy)
+
+
+def run_load_test(target: str, num_requests: int, concurrency: int, config: MockConfig,
+                  retry_policy: RetryPolicy) -> Dict:
+    """
+    Push num_requests skill tests through a LocalModel/RemoteModel backed by the mock server
+    and report throughput, client-side latency percentiles, errors, time spent in retry
+    backoff, and harness overhead (client latency minus server time and backoff).
+    """
+    server, state, base_url = start_in_thread(config)
+    os.environ["OPENAI_BASE_URL"] = f"{base_url}/v1"
+    os.environ.setdefault("OPENAI_API_KEY", "mock")
+    os.environ["OLLAMA_HOST"] = base_url
+    try:
+        model = build_target(target, retry_policy)
+        tests = [STATIC_SKILL_TESTS[i % len(STATIC_SKILL_TESTS)] for i in range(num_requests)]
+        baseline_stats = state.stats()
+        baseline_backoff = total_backoff_seconds()
+
+        def one_call(test):
+            start = time.monotonic()
+            try:
+                if target == "remote":
+                    model.generate_response([{"role": "user", "content": test.question}])
+                else:
+                    model.run_test(test)
+                ok = True
+            except ModelCallError:
+                ok = False
+            return time.monotonic() - start, ok
+
+        wall_start = time.monotonic()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = list(pool.map(one_call, tests))
+        wall = time.monotonic() - wall_start
+
+        stats = state.stats()
+        backoff = total_backoff_seconds() - baseline_backoff
+        server_requests = stats["total_requests"] - baseline_stats["total_requests"]
+        server_time = stats["total_server_time"] - baseline_stats["total_server_time"]
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    latencies = sorted(latency for latency, _ in results)
+    failures = sum(1 for _, ok in results if not ok)
+    mean_latency = sum(latencies) / len(latencies) if latencies else 0.0
+    mean_server = server_time / server_requests if server_requests else 0.0
+    return {
+        "target": target,
+        "requests": num_requests,
+        "concurrency": concurrency,
+        "wall_seconds": wall,
+        "throughput_per_second": num_requests / wall if wall > 0 else 0.0,
+        "failed_calls": failures,
+        "server_requests": server_requests,
+        "latency_p50": _percentile(latencies, 0.50),
+        "latency_p95": _percentile(latencies, 0.95),
+        "latency_p99": _percentile(latencies, 0.99),
+        "mean_latency": mean_latency,
+        "mean_server_time": mean_server,
+        "total_backoff_seconds": backoff,
+        "mean_backoff_per_call": backoff / num_requests if num_requests else 0.0,
+        # Retries make one call span several server requests, so compare per-request times
+        "mean_harness_overhead": ((mean_latency * num_requests - backoff) / server_requests - mean_server
+                                  if server_requests else 0.0),
+    }
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
+    parser = argparse.ArgumentParser(description="Load test the harness against the local mock server")
+    parser.add_argument("--target", choices=["local-ollama", "local-openai", "remote"], default="local-ollama")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--tokens-per-second", type=float, default=0.0)
+    parser.add_argument("--completion-tokens", type=int, default=32)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--max-attempts", type=int, default=3)
+    args = parser.parse_args()
+
+    mock_config = MockConfig(latency=args.latency, jitter=args.jitter, tokens_per_second=args.tokens_per_second,
+                             completion_tokens=args.completion_tokens, error_rate=args.error_rate,
+                             error_status=args.error_status)
+    policy = RetryPolicy(max_attempts=args.max_attempts, initial_backoff=0.05, max_backoff=1.0)
+    report = run_load_test(args.target, args.requests, args.concurrency, mock_config, policy)
+    print(json.dumps(report, indent=2))
@@ -0,0 +1,356 @@
+import argparse
+import json
+import logging
+import random
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass, fields
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger("MockServer")
+
+_FILLER_WORDS = ["alpha", "beta", "gamma", "delta", "epsilon", "zeta", "eta", "theta"]
+
+
+@dataclass
+class MockConfig:
+    """
+    Behaviour of the mock server. Every field can be changed at runtime by POSTing a JSON
+    object with the fields to update to /_mock/config.
+    """
+    latency: float = 0.05              # fixed seconds before the first token
+    jitter: float = 0.0                # extra uniform random latency in [0, jitter]
+    tokens_per_second: float = 0.0     # generation rate; 0 returns the whole reply instantly
+    completion_tokens: int = 32        # length of every reply, in tokens (one word per token)
+    error_rate: float = 0.0            # probability of answering with error_status
+    error_status: int = 503
+    disconnect_rate: float = 0.0       # probability of closing the connection without a reply
+    embedding_dim: int = 16
+    reply: str = ""                    # fixed reply text; generated filler if empty
+
+
+def count_tokens(text: str) -> int:
+    """Cheap token estimate (whitespace words), good enough for usage accounting in tests."""
+    return len(text.split())
+
+
+def _messages_tokens(messages: List[Dict[str, Any]]) -> int:
+    total = 0
+    for message in messages or []:
+        content = message.get("content", "")
+        if isinstance(content, list):
+            content = " ".join(part.get("text", "") for part in content if isinstance(part, dict))
+        total += count_tokens(str(content)) + 3
+    return total
+
+
+class MockState:
+    """Config plus request counters shared by all handler threads."""
+    def __init__(self, config: MockConfig):
+        self.config = config
+        self.lock = threading.Lock()
+        self.requests: Dict[str, int] = {}
+        self.errors = 0
+        self.server_time = 0.0
+
+    def record(self, path: str, elapsed: float, error: bool):
+        with self.lock:
+            self.requests[path] = self.requests.get(path, 0) + 1
+            self.server_time += elapsed
+            if error:
+                self.errors += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            total = sum(self.requests.values())
+            return {
+                "requests": dict(self.requests),
+                "total_requests": total,
+                "errors": self.errors,
+                "total_server_time": self.server_time,
+                "mean_server_time": self.server_time / total if total else 0.0,
+            }
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    """Speaks the OpenAI chat-completions/responses and Ollama chat/embed wire formats."""
+    protocol_version = "HTTP/1.1"
+    state: MockState = None  # set on the subclass created by make_server
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+    # ---- plumbing ----
+    def _read_json(self) -> Dict[str, Any]:
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return {}
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def _send_json(self, status: int, payload: Dict[str, Any]):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _start_stream(self, content_type: str):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+    def _write_chunk(self, data: str):
+        raw = data.encode("utf-8")
+        self.wfile.write(f"{len(raw):X}\r\n".encode("ascii") + raw + b"\r\n")
+        self.wfile.flush()
+
+    def _end_stream(self):
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+    def _reply_words(self, config: MockConfig) -> List[str]:
+        if config.reply:
+            return config.reply.split()
+        return [_FILLER_WORDS[i % len(_FILLER_WORDS)] for i in range(config.completion_tokens)]
+
+    def _inject_fault(self, config: MockConfig, openai_style: bool) -> bool:
+        """Apply latency and maybe an injected failure. Returns True if the request was answered."""
+        time.sleep(config.latency + random.uniform(0, config.jitter))
+        roll = random.random()
+        if roll < config.disconnect_rate:
+            self.close_connection = True
+            self.connection.shutdown(2)
+            return True
+        if roll < config.disconnect_rate + config.error_rate:
+            message = f"Injected failure (status {config.error_status})"
+            payload = {"error": {"message": message, "type": "server_error", "code": None}} if openai_style else {"error": message}
+            self._send_json(config.error_status, payload)
+            return True
+        return False
+
+    def _token_delay(self, config: MockConfig) -> float:
+        return 1.0 / config.tokens_per_second if config.tokens_per_second > 0 else 0.0
+
+    # ---- routing ----
+    def do_GET(self):
+        start = time.monotonic()
+        if self.path == "/api/tags":
+            self._send_json(200, {"models": [{
+                "name": "mock", "model": "mock", "modified_at": "2025-01-01T00:00:00Z",
+                "size": 0, "digest": "mock", "details": {},
+            }]})
+        elif self.path == "/api/version":
+            self._send_json(200, {"version": "0.0.0-mock"})
+        elif self.path == "/_mock/stats":
+            self._send_json(200, self.state.stats())
+            return
+        elif self.path == "/_mock/config":
+            self._send_json(200, asdict(self.state.config))
+            return
+        else:
+            self._send_json(404, {"error": f"Unknown path {self.path}"})
+        self.state.record(self.path, time.monotonic() - start, False)
+
+    def do_POST(self):
+        start = time.monotonic()
+        body = self._read_json()
+        path = self.path.split("?")[0]
+        if path == "/_mock/config":
+            self._update_config(body)
+            return
+        with self.state.lock:
+            config = MockConfig(**asdict(self.state.config))
+
+        routes = {
+            "/v1/chat/completions": self._chat_completions,
+            "/chat/completions": self._chat_completions,
+            "/v1/responses": self._responses,
+            "/responses": self._responses,
+            "/api/chat": self._ollama_chat,
+            "/api/embed": self._ollama_embed,
+            "/api/pull": self._ollama_pull,
+        }
+        handler = routes.get(path)
+        if handler is None:
+            self._send_json(404, {"error": f"Unknown path {path}"})
+            self.state.record(path, time.monotonic() - start, True)
+            return
+        failed = False
+        if path != "/api/pull":
+            failed = self._inject_fault(config, openai_style=not path.startswith("/api/"))
+        if not failed:
+            handler(body, config)
+        self.state.record(path, time.monotonic() - start, failed)
+
+    def _update_config(self, body: Dict[str, Any]):
+        known = {f.name for f in fields(MockConfig)}
+        unknown = set(body) - known
+        if unknown:
+            self._send_json(400, {"error": f"Unknown config fields: {sorted(unknown)}"})
+            return
+        with self.state.lock:
+            for key, value in body.items():
+                setattr(self.state.config, key, value)
+            self._send_json(200, asdict(self.state.config))
+
+    # ---- OpenAI ----
+    def _chat_completions(self, body: Dict[str, Any], config: MockConfig):
+        words = self._reply_words(config)
+        prompt_tokens = _messages_tokens(body.get("messages", []))
+        usage = {"prompt_tokens": prompt_tokens, "completion_tokens": len(words),
+                 "total_tokens": prompt_tokens + len(words)}
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        model = body.get("model", "mock")
+        created = int(time.time())
+        delay = self._token_delay(config)
+
+        if not body.get("stream"):
+            time.sleep(delay * len(words))
+            self._send_json(200, {
+                "id": completion_id, "object": "chat.completion", "created": created, "model": model,
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": " ".join(words)}}],
+                "usage": usage,
+            })
+            return
+
+        self._start_stream("text/event-stream")
+
+        def event(delta: Dict[str, Any], finish_reason: Optional[str], usage_field=None, choices=True):
+            chunk = {"id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model,
+                     "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}] if choices else []}
+            if usage_field is not None:
+                chunk["usage"] = usage_field
+            self._write_chunk(f"data: {json.dumps(chunk)}\n\n")
+
+        event({"role": "assistant", "content": ""}, None)
+        for i, word in enumerate(words):
+            time.sleep(delay)
+            event({"content": word if i == 0 else " " + word}, None)
+        event({}, "stop")
+        if (body.get("stream_options") or {}).get("include_usage"):
+            event({}, None, usage_field=usage, choices=False)
+        self._write_chunk("data: [DONE]\n\n")
+        self._end_stream()
+
+    def _responses(self, body: Dict[str, Any], config: MockConfig):
+        words = self._reply_words(config)
+        request_input = body.get("input", [])
+        if isinstance(request_input, str):
+            request_input = [{"role": "user", "content": request_input}]
+        input_tokens = _messages_tokens(request_input)
+        time.sleep(self._token_delay(config) * len(words))
+        # OpenAIClient.responses reads output[1], so the message follows a reasoning item
+        self._send_json(200, {
+            "id": f"resp_{uuid.uuid4().hex[:12]}", "object": "response", "created_at": int(time.time()),
+            "model": body.get("model", "mock"), "status": "completed",
+            "parallel_tool_calls": False, "tool_choice": "auto", "tools": [],
+            "output": [
+                {"type": "reasoning", "id": f"rs_{uuid.uuid4().hex[:12]}", "summary": []},
+                {"type": "message", "id": f"msg_{uuid.uuid4().hex[:12]}", "role": "assistant", "status": "completed",
+                 "content": [{"type": "output_text", "text": " ".join(words), "annotations": []}]},
+            ],
+            "usage": {"input_tokens": input_tokens, "output_tokens": len(words),
+                      "total_tokens": input_tokens + len(words),
+                      "input_tokens_details": {"cached_tokens": 0},
+                      "output_tokens_details": {"reasoning_tokens": 0}},
+        })
+
+    # ---- Ollama ----
+    def _ollama_chat(self, body: Dict[str, Any], config: MockConfig):
+        words = self._reply_words(config)
+        prompt_tokens = _messages_tokens(body.get("messages", []))
+        model = body.get("model", "mock")
+        delay = self._token_delay(config)
+        eval_ns = int(delay * len(words) * 1e9)
+        final = {
+            "model": model, "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "done": True, "done_reason": "stop",
+            "total_duration": eval_ns, "load_duration": 0,
+            "prompt_eval_count": prompt_tokens, "prompt_eval_duration": 0,
+            "eval_count": len(words), "eval_duration": eval_ns,
+        }
+        if not body.get("stream", True):
+            time.sleep(delay * len(words))
+            self._send_json(200, dict(final, message={"role": "assistant", "content": " ".join(words)}))
+            return
+
+        self._start_stream("application/x-ndjson")
+        for i, word in enumerate(words):
+            time.sleep(delay)
+            part = {"model": model, "created_at": final["created_at"], "done": False,
+                    "message": {"role": "assistant", "content": word if i == 0 else " " + word}}
+            self._write_chunk(json.dumps(part) + "\n")
+        self._write_chunk(json.dumps(dict(final, message={"role": "assistant", "content": ""})) + "\n")
+        self._end_stream()
+
+    def _ollama_embed(self, body: Dict[str, Any], config: MockConfig):
+        inputs = body.get("input", "")
+        if isinstance(inputs, str):
+            inputs = [inputs]
+        embeddings = []
+        for text in inputs:
+            rng = random.Random(text)
+            embeddings.append([rng.uniform(-1, 1) for _ in range(config.embedding_dim)])
+        self._send_json(200, {
+            "model": body.get("model", "mock"), "embeddings": embeddings,
+            "prompt_eval_count": sum(count_tokens(text) for text in inputs),
+        })
+
+    def _ollama_pull(self, body: Dict[str, Any], config: MockConfig):
+        self._send_json(200, {"status": "success"})
+
+
+class MockHTTPServer(ThreadingHTTPServer):
+    # The default listen backlog of 5 resets connections under load-test concurrency
+    request_queue_size = 1024
+    daemon_threads = True
+
+
+def make_server(config: Optional[MockConfig] = None, host: str = "127.0.0.1", port: int = 0) -> Tuple[MockHTTPServer, MockState]:
+    """Create (but do not start) a mock server. Port 0 picks a free port."""
+    state = MockState(config or MockConfig())
+    handler = type("BoundMockHandler", (MockHandler,), {"state": state})
+    server = MockHTTPServer((host, port), handler)
+    return server, state
+
+
+def start_in_thread(config: Optional[MockConfig] = None, host: str = "127.0.0.1", port: int = 0) -> Tuple[MockHTTPServer, MockState, str]:
+    """Start a mock server on a background thread. Returns (server, state, base URL)."""
+    server, state = make_server(config, host, port)
+    thread = threading.Thread(target=server.serve_forever, name="MockServer", daemon=True)
+    thread.start()
+    bound_host, bound_port = server.server_address[:2]
+    return server, state, f"http://{bound_host}:{bound_port}"
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Local OpenAI/Ollama-compatible mock server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--config", default=None, help="JSON file with MockConfig fields")
+    for f in fields(MockConfig):
+        parser.add_argument(f"--{f.name.replace('_', '-')}", type=type(f.default), default=None)
+    args = parser.parse_args()
+
+    config = MockConfig()
+    if args.config:
+        with open(args.config, "r", encoding="utf-8") as fh:
+            config = MockConfig(**json.load(fh))
+    for f in fields(MockConfig):
+        value = getattr(args, f.name)
+        if value is not None:
+            setattr(config, f.name, value)
+
+    server, _ = make_server(config, args.host, args.port)
+    logger.info(f"Mock server listening on http://{args.host}:{server.server_address[1]} "
+                f"(OpenAI base_url: /v1, Ollama host: root) with {config}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,251 @@
+import logging
+import random
+import re
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+from clients.resilience import ModelCallError
+from evaluation import grader
+from models.local_model import build_test_messages
+from prompts.skill_prompts import SYSTEM_GRADE_ANSWER_PROMPT
+from skill_tests.skill_test import SkillTest
+
+# An acceptance check gets the query and a tier's answer and decides whether to serve it
+AcceptanceCheck = Callable[[SkillTest, str], bool]
+
+_UNCERTAIN_PATTERN = re.compile(
+    r"\b(i don't know|i do not know|i'm not sure|i am not sure|cannot (?:answer|determine)|"
+    r"not enough information|unable to (?:answer|determine))\b",
+    re.IGNORECASE,
+)
+
+
+def heuristic_check(test: SkillTest, answer: str) -> bool:
+    """Accept any non-empty answer that does not hedge or refuse. Costs no model call."""
+    return bool(answer.strip()) and not _UNCERTAIN_PATTERN.search(answer)
+
+
+class JudgeCheck:
+    """
+    Accept an answer when a (small, usually local) judge model grades it at or above
+    `threshold` on the grader's 1-10 scale. Answers failing the heuristic check are rejected
+    without calling the judge.
+    """
+    def __init__(self, judge_model, threshold: int = 7):
+        self.judge_model = judge_model
+        self.threshold = threshold
+
+    def __call__(self, test: SkillTest, answer: str) -> bool:
+        if not heuristic_check(test, answer):
+            return False
+        judge_messages = [{"role": "system", "content": SYSTEM_GRADE_ANSWER_PROMPT}]
+        try:
+            score = grader.grade_answer(self.judge_model, judge_messages, test, answer)
+        except ModelCallError:
+            # No verdict is not a pass: escalate
+            return False
+        return score >= self.threshold
+
+
+@dataclass
+class CascadeResult:
+    """Answer served by the cascade and how it was obtained."""
+    answer: str
+    tier: str                  # name of the model whose answer was served
+    tier_index: int
+    latency: float             # seconds from query to served answer, including checks
+    escalations: int           # number of tiers rejected before the served one
+    tier_latencies: Dict[str, float] = field(default_factory=dict)
+    fallback: bool = False     # a rejected answer, served because every later tier failed
+
+
+class CascadeStats:
+    """Thread-safe per-tier counters for acceptance rates and latency."""
+    def __init__(self, tier_names: List[str]):
+        self.tier_names = tier_names
+        self.attempted = {name: 0 for name in tier_names}
+        self.accepted = {name: 0 for name in tier_names}
+        self.tier_latency = {name: 0.0 for name in tier_names}
+        self.queries = 0
+        self.fallbacks = 0
+        self.total_latency = 0.0
+        self.baseline_samples = 0
+        self.baseline_total = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, result: CascadeResult, attempted: List[str]):
+        with self._lock:
+            self.queries += 1
+            self.total_latency += result.latency
+            if result.fallback:
+                self.fallbacks += 1
+            else:
+                self.accepted[result.tier] += 1
+            for name in attempted:
+                self.attempted[name] += 1
+            for name, latency in result.tier_latencies.items():
+                self.tier_latency[name] += latency
+
+    def record_baseline(self, latency: float):
+        """Latency of the last tier on a randomly sampled query, served or not."""
+        with self._lock:
+            self.baseline_samples += 1
+            self.baseline_total += latency
+
+    def report(self, baseline_latency: Optional[float] = None) -> Dict:
+        """
+        Per-tier acceptance rates and mean latencies, and the latency saved compared with
+        sending every query straight to the last tier.
+        The baseline is `baseline_latency` if given (e.g. measured separately), otherwise the
+        mean of the sampled last-tier latencies. The last tier's own mean latency is no
+        baseline: it only covers the queries that escalated that far.
+        """
+        with self._lock:
+            tiers = []
+            for name in self.tier_names:
+                attempted = self.attempted[name]
+                tiers.append({
+                    "tier": name,
+                    "attempted": attempted,
+                    "served": self.accepted[name],
+                    "acceptance_rate": self.accepted[name] / attempted if attempted else None,
+                    "mean_latency": self.tier_latency[name] / attempted if attempted else None,
+                })
+            mean_latency = self.total_latency / self.queries if self.queries else None
+            baseline_samples = self.baseline_samples
+            if baseline_latency is None and baseline_samples:
+                baseline_latency = self.baseline_total / baseline_samples
+        saved = baseline_latency - mean_latency if baseline_latency is not None and mean_latency is not None else None
+        return {
+            "queries": self.queries,
+            "fallbacks": self.fallbacks,
+            "mean_latency": mean_latency,
+            "baseline_latency": baseline_latency,
+            "baseline_samples": baseline_samples,
+            "mean_latency_saved": saved,
+            "tiers": tiers,
+        }
+
+
+class CascadeModel:
+    """
+    Serve a query from the cheapest tier whose answer passes the acceptance check.
+    Tiers are ordered fastest first (e.g. small LocalModel, bigger LocalModel, RemoteModel);
+    the last tier's answer is always served. A tier whose call fails is skipped; when the
+    last tier fails, the rejected answer of the highest tier that did answer is served.
+
+    With race=True all tiers are started at once, on a pool of the query's own, and the
+    first acceptable answer in tier order is served; the results of calls still in flight
+    are discarded. This trades extra backend load for lower latency on escalated queries.
+
+    To report the latency saved, a random `baseline_sample_rate` fraction of the queries
+    also measures the last tier, off the serving path when it was not needed for the answer.
+    """
+    def __init__(self, tiers: List, check: AcceptanceCheck = heuristic_check, race: bool = False,
+                 baseline_sample_rate: float = 0.0):
+        if not tiers:
+            raise ValueError("A cascade needs at least one tier")
+        self.tiers = tiers
+        self.check = check
+        self.race = race
+        self.baseline_sample_rate = baseline_sample_rate
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.stats = CascadeStats([tier.name for tier in tiers])
+        self._baseline_executor = ThreadPoolExecutor(max_workers=1) if baseline_sample_rate > 0 else None
+        self._rng = random.Random()
+
+    def _call_tier(self, tier, messages) -> Optional[str]:
+        try:
+            return tier.generate_response(messages).strip()
+        except ModelCallError as e:
+            self.logger.warning(f"Tier '{tier.name}' failed, escalating: {e}")
+            return None
+
+    def answer(self, test: SkillTest) -> CascadeResult:
+        messages = build_test_messages(test)
+        start = time.monotonic()
+        futures: List[Future] = []
+        submitted: List[float] = []
+        executor = None
+        if self.race:
+            # A pool per query: calls abandoned by earlier queries must not delay this one
+            executor = ThreadPoolExecutor(max_workers=len(self.tiers))
+            for tier in self.tiers:
+                submitted.append(time.monotonic())
+                futures.append(executor.submit(self._timed_call, tier, messages))
+
+        tier_latencies: Dict[str, float] = {}
+        attempted: List[str] = []
+        last = len(self.tiers) - 1
+        result = None
+        rejected = None
+        for i, tier in enumerate(self.tiers):
+            if self.race:
+                answer, finished_at = futures[i].result()
+                tier_latencies[tier.name] = finished_at - submitted[i]
+            else:
+                tier_start = time.monotonic()
+                answer = self._call_tier(tier, messages)
+                tier_latencies[tier.name] = time.monotonic() - tier_start
+            attempted.append(tier.name)
+            if answer is None:
+                continue
+            if i == last or self.check(test, answer):
+                result = CascadeResult(answer=answer, tier=tier.name, tier_index=i,
+                                       latency=time.monotonic() - start, escalations=i,
+                                       tier_latencies=tier_latencies)
+                break
+            self.logger.info(f"Tier '{tier.name}' answer rejected, escalating")
+            rejected = (i, tier, answer)
+
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+        if result is None and rejected is not None:
+            i, tier, answer = rejected
+            self.logger.warning(f"Later tiers failed; serving the rejected answer of tier '{tier.name}'")
+            result = CascadeResult(answer=answer, tier=tier.name, tier_index=i,
+                                   latency=time.monotonic() - start, escalations=i,
+                                   tier_latencies=tier_latencies, fallback=True)
+        if result is None:
+            raise ModelCallError("Every tier of the cascade failed")
+        self.stats.record(result, attempted)
+        if self._baseline_executor is not None and self._rng.random() < self.baseline_sample_rate:
+            self._sample_baseline(messages, tier_latencies, futures, submitted)
+        return result
+
+    def _sample_baseline(self, messages, tier_latencies: Dict[str, float], futures: List[Future],
+                         submitted: List[float]):
+        last_tier = self.tiers[-1]
+        if last_tier.name in tier_latencies:
+            self.stats.record_baseline(tier_latencies[last_tier.name])
+        elif futures:
+            # Race mode: the last tier is already running, time it when it finishes
+            self._baseline_executor.submit(self._await_baseline, futures[-1], submitted[-1])
+        else:
+            self._baseline_executor.submit(self._measure_baseline, last_tier, messages)
+
+    def _await_baseline(self, future: Future, submitted_at: float):
+        answer, finished_at = future.result()
+        if answer is not None:
+            self.stats.record_baseline(finished_at - submitted_at)
+
+    def _measure_baseline(self, tier, messages):
+        started_at = time.monotonic()
+        answer, finished_at = self._timed_call(tier, messages)
+        if answer is not None:
+            self.stats.record_baseline(finished_at - started_at)
+
+    def _timed_call(self, tier, messages):
+        answer = self._call_tier(tier, messages)
+        return answer, time.monotonic()
+
+    def close(self):
+        """Wait for pending baseline measurements, so the report includes them."""
+        if self._baseline_executor is not None:
+            self._baseline_executor.shutdown(wait=True)
+
+    def __repr__(self):
+        return f"CascadeModel(tiers={[tier.name for tier in self.tiers]}, race={self.race})"
@@ -0,0 +1,160 @@
+import contextvars
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+import tiktoken
+
+from evaluation.results_store import ResultsStore, _hash, model_fingerprint
+from prompts.skill_prompts import (SYSTEM_TEST_LOCAL_MODEL_SKILL, USER_LOCAL_SKILL_CHUNK_PROMPT,
+                                   USER_LOCAL_SKILL_REDUCE_PROMPT)
+from skill_tests.skill_test import SkillTest
+
+NO_RELEVANT_INFORMATION = "NO RELEVANT INFORMATION"
+
+
+def split_by_tokens(text: str, encoding: tiktoken.Encoding, chunk_tokens: int, overlap_tokens: int = 0) -> List[str]:
+    """
+    Split text into windows of at most chunk_tokens tokens, consecutive windows sharing
+    overlap_tokens tokens so that facts on a boundary appear whole in at least one chunk.
+    """
+    if overlap_tokens >= chunk_tokens:
+        raise ValueError("overlap_tokens must be smaller than chunk_tokens")
+    tokens = encoding.encode(text)
+    if len(tokens) <= chunk_tokens:
+        return [text]
+    step = chunk_tokens - overlap_tokens
+    return [encoding.decode(tokens[start:start + chunk_tokens])
+            for start in range(0, len(tokens) - overlap_tokens, step)]
+
+
+class ChunkedModel:
+    """
+    Map-reduce execution mode for a LocalModel, for tests whose context does not fit in
+    one prompt. The context is split into chunks of chunk_tokens tokens; every chunk is
+    answered on its own (map, up to max_parallel calls at once) and the partial answers are
+    combined by a final call (reduce). Partial answers that do not fit in one reduce prompt
+    are combined in groups first, so the reduce prompts stay within chunk_tokens as well.
+    Tests with a short enough context go through the wrapped model's single-shot path.
+
+    chunk_tokens should leave room in the model's context window (num_ctx for Ollama) for
+    the prompt templates and max_tokens of output. Tokens are counted with tiktoken, which
+    only approximates the tokenizers of local models.
+
+    With a cache, every chunk answer is stored under a key of the model configuration,
+    the prompt templates, the question and the chunk text, so re-running a test over the
+    same document only calls the model for chunks that have not been answered yet.
+    Ollama serves parallel requests only up to its OLLAMA_NUM_PARALLEL setting.
+    """
+    def __init__(self, model, chunk_tokens: int = 2048, overlap_tokens: int = 128, max_parallel: int = 4,
+                 cache: Optional[ResultsStore] = None, encoding_name: str = "cl100k_base"):
+        if overlap_tokens >= chunk_tokens:
+            raise ValueError("overlap_tokens must be smaller than chunk_tokens")
+        self.model = model
+        self.name = model.name
+        self.model_type = model.model_type
+        self.client = model.client
+        self.chunk_tokens = chunk_tokens
+        self.overlap_tokens = overlap_tokens
+        self.max_parallel = max_parallel
+        self.cache = cache
+        self.encoding = tiktoken.get_encoding(encoding_name)
+        self.logger = logging.getLogger(self.__class__.__name__ + f"({self.name})")
+        self.chunk_calls = 0
+        self.cache_hits = 0
+        self._lock = threading.Lock()
+
+    @property
+    def ledger(self):
+        return self.model.ledger
+
+    @ledger.setter
+    def ledger(self, ledger):
+        self.model.ledger = ledger
+
+    @property
+    def chunking(self) -> Dict[str, Any]:
+        """Settings that change the answers of chunked tests; part of the keys of those cells."""
+        return {
+            "chunk_tokens": self.chunk_tokens,
+            "overlap_tokens": self.overlap_tokens,
+            "prompts": _hash(USER_LOCAL_SKILL_CHUNK_PROMPT, USER_LOCAL_SKILL_REDUCE_PROMPT),
+        }
+
+    def needs_chunking(self, test: SkillTest) -> bool:
+        return bool(test.context) and len(self.encoding.encode(test.context)) > self.chunk_tokens
+
+    def generate_response(self, messages: List[Dict[str, Any]]) -> str:
+        return self.model.generate_response(messages)
+
+    def run_test(self, test: SkillTest) -> str:
+        """Answer a SkillTest, chunking its context if it exceeds chunk_tokens."""
+        if not self.needs_chunking(test):
+            return self.model.run_test(test)
+
+        chunks = split_by_tokens(test.context, self.encoding, self.chunk_tokens, self.overlap_tokens)
+        self.logger.info(f"Answering '{test.skill}' test over {len(chunks)} chunks")
+        with ThreadPoolExecutor(max_workers=self.max_parallel) as pool:
+            # Copy the caller's context into the workers so cost attribution follows the calls
+            futures = [pool.submit(contextvars.copy_context().run, self._answer_chunk, test, i, chunks)
+                       for i in range(len(chunks))]
+            notes = [future.result() for future in futures]
+
+            notes = [note for note in notes if note and NO_RELEVANT_INFORMATION not in note.upper()]
+            if not notes:
+                notes = ["No part of the document contains information relevant to the question."]
+            while True:
+                groups = self._group_notes(notes)
+                if len(groups) == 1:
+                    break
+                futures = [pool.submit(contextvars.copy_context().run, self._reduce, test, group)
+                           for group in groups]
+                notes = [future.result() for future in futures]
+        return self._reduce(test, groups[0])
+
+    def _answer_chunk(self, test: SkillTest, index: int, chunks: List[str]) -> str:
+        content = USER_LOCAL_SKILL_CHUNK_PROMPT.format(question=test.question, context=chunks[index],
+                                                       chunk_index=index + 1, num_chunks=len(chunks))
+        key = None
+        if self.cache is not None:
+            key = _hash(model_fingerprint(self.model), SYSTEM_TEST_LOCAL_MODEL_SKILL, content)
+            record = self.cache.get(key)
+            if record is not None:
+                with self._lock:
+                    self.cache_hits += 1
+                return record["answer"]
+
+        answer = self.model.generate_response([
+            {"role": "system", "content": SYSTEM_TEST_LOCAL_MODEL_SKILL},
+            {"role": "user", "content": content},
+        ]).strip()
+        with self._lock:
+            self.chunk_calls += 1
+        if self.cache is not None:
+            self.cache.put(key, {"model": self.name, "skill": test.skill, "chunk": index, "answer": answer})
+        return answer
+
+    def _group_notes(self, notes: List[str]) -> List[List[str]]:
+        """Pack consecutive notes into groups that fit in chunk_tokens (at least two per group)."""
+        groups: List[List[str]] = [[]]
+        size = 0
+        for note in notes:
+            note_tokens = len(self.encoding.encode(note))
+            if len(groups[-1]) >= 2 and size + note_tokens > self.chunk_tokens:
+                groups.append([])
+                size = 0
+            groups[-1].append(note)
+            size += note_tokens
+        return groups
+
+    def _reduce(self, test: SkillTest, notes: List[str]) -> str:
+        partial_answers = "\n\n".join(f"[Part {i}]\n{note}" for i, note in enumerate(notes, start=1))
+        return self.model.generate_response([
+            {"role": "system", "content": SYSTEM_TEST_LOCAL_MODEL_SKILL},
+            {"role": "user", "content": USER_LOCAL_SKILL_REDUCE_PROMPT.format(question=test.question,
+                                                                              partial_answers=partial_answers)},
+        ]).strip()
+
+    def __repr__(self):
+        return f"ChunkedModel(model={self.model!r}, chunk_tokens={self.chunk_tokens})"
@@ -1,29 +1,65 @@
 import logging
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Optional, Tuple
 from clients.openai import OpenAIClient
 from clients.ollama import OllamaClient
+from clients.resilience import ModelCallError, RetryPolicy, call_with_resilience, get_breaker
 from prompts.skill_prompts import SYSTEM_TEST_LOCAL_MODEL_SKILL, USER_LOCAL_SKILL_CONTEXT_PROMPT, USER_LOCAL_SKILL_NO_CONTEXT_PROMPT
 from skill_tests.skill_test import SkillTest
 
+def build_test_messages(test: SkillTest) -> List[Dict[str, Any]]:
+    """
+    Build the system and user messages used to answer a SkillTest.
+    Shared by every model that answers skill tests so their prompts stay identical.
+    """
+    # System message defines the AI assistant's role and guidelines
+    system_message = {
+        "role": "system",
+        "content": SYSTEM_TEST_LOCAL_MODEL_SKILL
+    }
+
+    # User message contains the actual question and context
+    if test.context:
+        question_content = USER_LOCAL_SKILL_CONTEXT_PROMPT.format(question=test.question,
+                                                                  context=test.context)
+    else:
+        question_content = USER_LOCAL_SKILL_NO_CONTEXT_PROMPT.format(question=test.question)
+
+    user_message = {
+        "role": "user",
+        "content": question_content
+    }
+
+    return [system_message, user_message]
+
 class LocalModel:
     """
     Local model (minion) which can use either OpenAI API or Ollama (local LLM).
     Provides a unified interface to get responses from the model.
     """
-    def __init__(self, name: str, model_type: str = "openai", model_name: str = "gpt-3.5-turbo", temperature: float = 0.0, max_tokens: int = 1024):
+    def __init__(self, name: str, model_type: str = "openai", model_name: str = "gpt-3.5-turbo", temperature: float = 0.0, max_tokens: int = 1024,
+                 timeout: float = 120.0, retry_policy: Optional[RetryPolicy] = None, num_ctx: Optional[int] = None):
         """
         model_type: "openai" for OpenAI API, "ollama" for local Ollama server.
         model_name: identifier for the model (e.g., "gpt-3.5-turbo" or an Ollama model name).
+        num_ctx: context window for Ollama models (client default if not given).
+        timeout: per-request timeout in seconds; retry_policy: retries and overall deadline per call.
         """
         self.name = name
         self.model_type = model_type.lower()
         self.logger = logging.getLogger(self.__class__.__name__ + f"({name})")
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.timeout = timeout
+        # Optional CostLedger that records the token usage of every successful call
+        self.ledger = None
         if self.model_type == "openai":
-            # Create OpenAI client for this model
-            self.client = OpenAIClient(model_name=model_name, temperature=temperature, max_tokens=max_tokens)
+            # Create OpenAI client for this model; retries are handled by the resilience layer
+            self.client = OpenAIClient(model_name=model_name, temperature=temperature, max_tokens=max_tokens,
+                                       timeout=timeout, max_retries=0)
         elif self.model_type == "ollama":
             # Create Ollama client for this model
-            self.client = OllamaClient(model_name=model_name, temperature=temperature, max_tokens=max_tokens)
+            ollama_kwargs = {"num_ctx": num_ctx} if num_ctx is not None else {}
+            self.client = OllamaClient(model_name=model_name, temperature=temperature, max_tokens=max_tokens,
+                                       timeout=timeout, **ollama_kwargs)
         else:
             raise ValueError(f"Unsupported model_type: {model_type}")
         self.logger.info(f"Initialized local model '{name}' of type '{model_type}' with model_name='{model_name}'")
@@ -32,12 +68,21 @@ class LocalModel:
         """
         Send a list of messages to the model and return the response text.
         Handles the difference in return format between OpenAI and Ollama clients.
+        Raises ModelCallError if no response could be obtained, so a failed call is never
+        mistaken for an empty answer.
         """
         try:
-            result = self.client.chat(messages=messages)
-        except Exception as e:
+            result = call_with_resilience(self.client.chat, messages=messages,
+                                          policy=self.retry_policy,
+                                          breaker=get_breaker(self.client.backend_key),
+                                          label=f"Local model '{self.name}'",
+                                          timeout=self.timeout)
+        except ModelCallError as e:
             self.logger.error(f"Local model '{self.name}' API call failed: {e}")
-            return ""
+            raise
+
+        if self.ledger is not None and isinstance(result, tuple) and len(result) > 1:
+            self.ledger.record(self.name, self.client.model_name, result[1])
 
         # Both OpenAIClient.chat and OllamaClient.chat return a tuple; first element is list of outputs.
         outputs = result[0] if isinstance(result, tuple) else result
@@ -53,26 +98,7 @@ class LocalModel:
         Given a SkillTest (with context and question), run the local model to produce an answer.
         Constructs the prompt using system and user messages for better model guidance.
         """
-        # System message defines the AI assistant's role and guidelines
-        system_message = {
-            "role": "system",
-            "content": SYSTEM_TEST_LOCAL_MODEL_SKILL
-        }
-
-        # User message contains the actual question and context
-        if test.context:
-            question_content = USER_LOCAL_SKILL_CONTEXT_PROMPT.format(question=test.question,
-                                                                      context=test.context)
-        else:
-            question_content = USER_LOCAL_SKILL_NO_CONTEXT_PROMPT.format(question=test.question)
-
-        user_message = {
-            "role": "user",
-            "content": question_content
-        }
-
-        messages = [system_message, user_message]
-        answer = self.generate_response(messages)
+        answer = self.generate_response(build_test_messages(test))
         return answer.strip()
 
     def __repr__(self):
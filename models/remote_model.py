@@ -1,29 +1,45 @@
 import logging
 from typing import Optional, List, Dict, Any, Tuple
 from clients.openai import OpenAIClient
+from clients.resilience import ModelCallError, RetryPolicy, call_with_resilience, get_breaker
 
 class RemoteModel:
     """
     Remote model (supervisor) that uses a powerful LLM (e.g., GPT-4 via OpenAI).
     Provides an interface to generate responses using the OpenAI API.
     """
-    def __init__(self, name: str, model_name: str = "gpt-4", temperature: float = 0.0, max_tokens: int = 2048):
+    def __init__(self, name: str, model_name: str = "gpt-4", temperature: float = 0.0, max_tokens: int = 2048,
+                 timeout: float = 120.0, retry_policy: Optional[RetryPolicy] = None):
         self.name = name
         self.logger = logging.getLogger(self.__class__.__name__)
-        # Initialize OpenAI client for the remote model
-        self.client = OpenAIClient(model_name=model_name, temperature=temperature, max_tokens=max_tokens)
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.timeout = timeout
+        # Optional CostLedger that records the token usage of every successful call
+        self.ledger = None
+        # Initialize OpenAI client for the remote model; retries are handled by the resilience layer
+        self.client = OpenAIClient(model_name=model_name, temperature=temperature, max_tokens=max_tokens,
+                                   timeout=timeout, max_retries=0)
         self.logger.info(f"Initialized remote model '{name}' with model_name='{model_name}'")
 
     def generate_response(self, messages: List[Dict[str, Any]]) -> str:
         """
         Send a list of messages (role/content dicts) to the model and return the response text.
         This wraps the underlying OpenAIClient to provide a unified interface.
+        Raises ModelCallError if no response could be obtained.
         """
         try:
-            result = self.client.chat(messages=messages)
-        except Exception as e:
+            result = call_with_resilience(self.client.chat, messages=messages,
+                                          policy=self.retry_policy,
+                                          breaker=get_breaker(self.client.backend_key),
+                                          label=f"Remote model '{self.name}'",
+                                          timeout=self.timeout)
+        except ModelCallError as e:
             self.logger.error(f"Remote model API call failed: {e}")
-            return ""
+            raise
+
+        if self.ledger is not None and isinstance(result, tuple) and len(result) > 1:
+            self.ledger.record(self.name, self.client.model_name, result[1])
+
         # OpenAIClient.chat returns (responses, usage) tuple; take the first response string
         outputs = result[0] if isinstance(result, tuple) else result
         if isinstance(outputs, list) and outputs:
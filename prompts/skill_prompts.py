@@ -48,3 +48,42 @@ USER_GRADE_ANSWER_PROMPT = """Question: {question}
 Context: {context}
 Expected answer: {expected_answer}
 Answer to evaluate: {answer_to_evaluate}"""
+
+
+USER_LOCAL_SKILL_CHUNK_PROMPT = """Q: {question}
+Context (part {chunk_index} of {num_chunks} of a longer document): {context}
+
+Answer the question using only this part of the document. Write down every fact from this part that is relevant to the question, since your notes will be combined with notes on the other parts.
+If this part contains nothing relevant to the question, reply with exactly: NO RELEVANT INFORMATION
+A:"""
+
+USER_LOCAL_SKILL_REDUCE_PROMPT = """Q: {question}
+Notes taken from consecutive parts of a document that is too long to read at once:
+{partial_answers}
+
+Combine the notes into one answer to the question about the whole document. Resolve repetitions and keep the facts from every part that matter for the question.
+A:"""
+
+
+SYSTEM_RANK_ANSWERS_PROMPT = """You are a strict grader. You will receive a question, context, expected answer, and several candidate answers labeled with letters.
+
+You will receive inputs in the following format:
+
+Question: [question]
+Context: [context]
+Expected answer: [expected answer]
+Answer A: [answer]
+Answer B: [answer]
+...
+
+Your job is to compare the candidate answers with each other based on the question, context, and expected answer.
+Note that an answer does not need to be exactly the same as the expected answer, but it should be correct. The order in which the answers are listed says nothing about their quality.
+
+Rank all candidate answers from best to worst. Use ">" between an answer and the next worse one and "=" between answers of equal quality, and mention every letter exactly once.
+Please just output the ranking on one line, for example:
+Ranking: C > A = D > B"""
+
+USER_RANK_ANSWERS_PROMPT = """Question: {question}
+Context: {context}
+Expected answer: {expected_answer}
+{answers}"""
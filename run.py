@@ -1,38 +1,86 @@
 import logging
 from models.remote_model import RemoteModel
 from models.local_model import LocalModel
+from models.chunked import ChunkedModel
 from skill_tests.static_tests import STATIC_SKILL_TESTS
 from skill_tests.dynamic_tests import generate_skill_tests
-from evaluation import grader, aggregator
+from evaluation import aggregator, runner
+from evaluation.cost_ledger import CostLedger, PriceTable
+from evaluation.long_context import compare_chunked
+from evaluation.results_store import ResultsStore
+from evaluation.streaming import StreamingAggregator
+from evaluation.tournament import run_tournament
 from visualization import plotter
+from visualization.progress import ProgressDashboard
+from sweep.launcher import run_sweep
+from sweep.spec import load_sweep_spec
 import argparse
-from collections import defaultdict
-from prompts.skill_prompts import SYSTEM_GRADE_ANSWER_PROMPT
+import json
+import sys
 
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO)
     logger = logging.getLogger("SkillEvaluationRunner")
     parser = argparse.ArgumentParser(description="Run skill evaluation")
     parser.add_argument("--dynamic", action="store_true", help="Use dynamic skill tests")
+    parser.add_argument("--results-store", default=None,
+                        help="Persistent results file; only cells missing from it are evaluated "
+                             "(default: results_store.jsonl, or the sweep's output_dir with --sweep)")
+    parser.add_argument("--no-store", action="store_true", help="Evaluate every cell and do not persist results")
+    parser.add_argument("--plot", choices=["auto", "boxplot", "heatmap", "grid"], default="auto",
+                        help="Plot style; 'auto' switches from boxplots to a heatmap for large sweeps")
+    parser.add_argument("--progress", action="store_true",
+                        help="Show a live progress dashboard (per-call logs are reduced to warnings)")
+    parser.add_argument("--stop-when-settled", action="store_true",
+                        help="Stop once every skill's model ranking is statistically settled")
+    parser.add_argument("--sweep", default=None,
+                        help="YAML/TOML sweep spec; evaluates its model-config matrix instead of the default models")
+    parser.add_argument("--prices", default=None, help="JSON/YAML price table (USD per million tokens)")
+    parser.add_argument("--soft-budget", type=float, default=None, help="Spend (USD) after which scheduling is throttled")
+    parser.add_argument("--hard-budget", type=float, default=None, help="Spend (USD) after which no new work is scheduled")
+    parser.add_argument("--chunk-tokens", type=int, default=None,
+                        help="Answer tests whose context exceeds this many tokens by chunked map-reduce")
+    parser.add_argument("--chunk-overlap", type=int, default=128, help="Tokens shared by consecutive chunks")
+    parser.add_argument("--chunk-cache", default="chunk_cache.jsonl",
+                        help="Cache of chunk answers, so re-runs over the same documents skip finished chunks")
+    parser.add_argument("--compare-chunked", action="store_true",
+                        help="Only compare latency and score of single-shot vs chunked answers on long-context tests")
+    parser.add_argument("--grading", choices=["absolute", "tournament"], default="absolute",
+                        help="'tournament' ranks all models' answers to a test in one grader call and reports Elo ratings")
+    parser.add_argument("--group-size", type=int, default=8, help="Most answers ranked in one tournament grader call")
     args = parser.parse_args()
+    if args.grading == "tournament" and args.sweep:
+        parser.error("--grading tournament is not supported with --sweep")
+    if args.sweep:
+        # Sweeps always persist results and run configs concurrently; chunking is set per config
+        unsupported = [flag for flag, value in (("--no-store", args.no_store), ("--progress", args.progress),
+                                                ("--stop-when-settled", args.stop_when_settled),
+                                                ("--chunk-tokens", args.chunk_tokens is not None),
+                                                ("--compare-chunked", args.compare_chunked)) if value]
+        if unsupported:
+            parser.error(f"{', '.join(unsupported)} not supported with --sweep")
+    if args.compare_chunked and args.chunk_tokens is None:
+        parser.error("--compare-chunked requires --chunk-tokens")
+    if args.progress:
+        logging.getLogger().setLevel(logging.WARNING)
+
+    spec = load_sweep_spec(args.sweep) if args.sweep else None
 
     # Configuration: choose static or dynamic skill tests
-    NUM_DYNAMIC_TESTS_PER_SKILL = 2  # only used if USE_DYNAMIC_TESTS is True
+    NUM_DYNAMIC_TESTS_PER_SKILL = spec.tests_per_skill if spec else 2  # only used for dynamic tests
 
-    # TODO: Make this configurable
     # Initialize remote "supervisor" model (e.g., GPT-4 via OpenAI)
-    remote_model = RemoteModel(name="GPT-4 Supervisor", model_name="gpt-4")
+    remote_model = RemoteModel(name="GPT-4 Supervisor", model_name=spec.remote_model if spec else "gpt-4")
 
-    # hardcoded: one GPT-3.5 Turbo and one Llama2 7B
-    local_models = [
-        LocalModel(name="GPT-3.5 Turbo", model_type="openai", model_name="gpt-3.5-turbo"),
-        LocalModel(name="Llama2 7B", model_type="ollama", model_name="llama2")
-    ]
+    # Cost ledger shared by every model of the run
+    ledger = CostLedger(PriceTable.load(args.prices) if args.prices else PriceTable(),
+                        soft_budget=args.soft_budget, hard_budget=args.hard_budget)
+    remote_model.ledger = ledger
 
     # Prepare skill tests (either static or dynamic)
     # TODO: maybe the remote model should choose which skills to test?
-    if args.dynamic:
-        skills_to_test = ["summarization", "extraction", "reasoning"]
+    if args.dynamic or (spec and spec.tests == "dynamic"):
+        skills_to_test = spec.dynamic_skills if spec else ["summarization", "extraction", "reasoning"]
         skill_tests = generate_skill_tests(remote_model, skills_to_test, tests_per_skill=NUM_DYNAMIC_TESTS_PER_SKILL)
         logger.info(f"Generated {len(skill_tests)} dynamic skill tests using the remote model.")
     else:
@@ -41,18 +89,54 @@ if __name__ == "__main__":
         logger.info(f"Loaded {len(skill_tests)} static skill tests.")
 
     # Dictionary to collect scores: scores[model_name][skill] = [scores...]
-    scores = {model.name: defaultdict(list) for model in local_models}
-    for model in local_models:
-        system_message = {"role": "system", "content": SYSTEM_GRADE_ANSWER_PROMPT}
-        grader_messages = [system_message]
-
-        for test in skill_tests:
-            # Ensure each skill has a list initialized for this model
-            answer = model.run_test(test)
-            logger.info(f"{model.name} -> Task: {test.skill} | Question: {test.question} | Answer: {answer}")
-            score = grader.grade_answer(remote_model, grader_messages, test, answer)
-            scores[model.name][test.skill].append(score)
-            logger.info(f"Graded score for {model.name} on {test.skill}: {score}/10")
+    if spec:
+        sweep_store = ResultsStore(args.results_store) if args.results_store else None
+        records = run_sweep(spec, remote_model, skill_tests, store=sweep_store, ledger=ledger)
+        scores = {name: record["scores"] for name, record in records.items() if record["status"] == "ok"}
+        model_costs = {name: record["cost"] for name, record in records.items() if record["status"] == "ok"}
+        print(f"Sweep results written to {spec.output_dir}")
+    else:
+        # Default models when no sweep spec is given: one GPT-3.5 Turbo and one Llama2 7B
+        local_models = [
+            LocalModel(name="GPT-3.5 Turbo", model_type="openai", model_name="gpt-3.5-turbo"),
+            LocalModel(name="Llama2 7B", model_type="ollama", model_name="llama2")
+        ]
+        for model in local_models:
+            model.ledger = ledger
+        if args.chunk_tokens is not None:
+            chunk_cache = ResultsStore(args.chunk_cache)
+            chunked_models = [ChunkedModel(model, chunk_tokens=args.chunk_tokens, overlap_tokens=args.chunk_overlap,
+                                           cache=chunk_cache) for model in local_models]
+            if args.compare_chunked:
+                comparison = compare_chunked(local_models, remote_model, skill_tests, chunked_models=chunked_models)
+                print("Single-shot vs chunked comparison on long-context tests:")
+                print(json.dumps(comparison, indent=2))
+                print(f"Total cost: ${ledger.total_cost:.4f}")
+                sys.exit(0)
+            local_models = chunked_models
+        store = None if args.no_store else ResultsStore(args.results_store or "results_store.jsonl")
+        if args.grading == "tournament":
+            result = run_tournament(local_models, remote_model, skill_tests, store=store, ledger=ledger,
+                                    group_size=args.group_size)
+            print(f"Tournament ratings (Elo, {result.rankings} rankings, {result.grader_calls} grader calls this run):")
+            for model_name, skill_dict in result.as_summary().items():
+                for skill, rating in skill_dict.items():
+                    rating_display = f"{rating:.0f}" if rating is not None else "N/A"
+                    print(f"  {model_name} - {skill}: {rating_display}")
+            print(f"Total cost: ${ledger.total_cost:.4f}")
+            sys.exit(0)
+        tracker = StreamingAggregator() if args.progress or args.stop_when_settled else None
+        if args.progress:
+            with ProgressDashboard(tracker):
+                scores = runner.run_evaluation(local_models, remote_model, skill_tests, store=store,
+                                               tracker=tracker, stop_when_settled=args.stop_when_settled,
+                                               ledger=ledger)
+        else:
+            scores = runner.run_evaluation(local_models, remote_model, skill_tests, store=store,
+                                           tracker=tracker, stop_when_settled=args.stop_when_settled,
+                                           ledger=ledger)
+        # Stored cells were paid for by earlier runs; their recorded costs count too
+        model_costs = store.collect_costs(local_models, skill_tests, remote_model) if store is not None else None
 
     # Aggregate skill levels for each model (e.g., average score per skill)
     skill_summary = aggregator.summarize_scores(scores)
@@ -62,6 +146,23 @@ if __name__ == "__main__":
             avg_display = f"{avg_score:.2f}" if avg_score is not None else "N/A"
             print(f"  {model_name} - {skill}: {avg_display}")
 
-    # Visualize skill level distributions for each model using boxplots
-    plotter.plot_skill_levels(scores, save_path="skill_levels.png")
-    print("Skill level boxplot saved to skill_levels.png")
\ No newline at end of file
+    # Cost report: spend by model and phase, and cost per point of score for each local model
+    cost_report = ledger.report(skill_summary, model_costs)
+    print(f"Total cost: ${cost_report['total_cost']:.4f}")
+    for dimension in ("by_model", "by_phase"):
+        for name, entry in cost_report[dimension].items():
+            print(f"  {dimension[3:]} {name}: ${entry['cost']:.4f} ({entry['calls']} calls, {entry['total_tokens']} tokens)")
+    for model_name, per_point in cost_report["cost_per_point"].items():
+        per_point_display = f"${per_point:.4f}" if per_point is not None else "N/A"
+        print(f"  {model_name}: {per_point_display} per point of average score")
+
+    # Visualize skill level distributions for each model
+    plot_kind = args.plot
+    if plot_kind == "auto":
+        num_skills = len({skill for model_scores in scores.values() for skill in model_scores})
+        plot_kind = "boxplot" if len(scores) <= 8 and num_skills <= 6 else "heatmap"
+    if plot_kind == "boxplot":
+        plotter.plot_skill_levels(scores, save_path="skill_levels.png")
+    else:
+        plotter.plot_skill_quantiles(aggregator.summarize_quantiles(scores), save_path="skill_levels.png", kind=plot_kind)
+    print(f"Skill level {plot_kind} saved to skill_levels.png")
\ No newline at end of file
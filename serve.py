@@ -0,0 +1,77 @@
+import argparse
+import logging
+import sys
+
+from clients.resilience import ModelCallError
+from models.cascade import CascadeModel, JudgeCheck, heuristic_check
+from models.local_model import LocalModel
+from models.remote_model import RemoteModel
+from skill_tests.skill_test import SkillTest
+from skill_tests.static_tests import STATIC_SKILL_TESTS
+
+
+def parse_tier(spec: str) -> LocalModel:
+    """Build a LocalModel from a "model_type:model_name" spec, e.g. "ollama:llama3.2:1b"."""
+    model_type, _, model_name = spec.partition(":")
+    if not model_name:
+        raise argparse.ArgumentTypeError(f"Expected model_type:model_name, got '{spec}'")
+    return LocalModel(name=spec, model_type=model_type, model_name=model_name)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
+    parser = argparse.ArgumentParser(description="Serve queries through a fast-to-slow model cascade")
+    parser.add_argument("--tier", action="append", required=True,
+                        help="Local tier as model_type:model_name, fastest first (repeatable)")
+    parser.add_argument("--remote", default=None, help="OpenAI model used as the final fallback tier")
+    parser.add_argument("--judge", default=None,
+                        help="model_type:model_name of a small judge; without it a heuristic check is used")
+    parser.add_argument("--threshold", type=int, default=7, help="Minimum judge score (1-10) to accept an answer")
+    parser.add_argument("--race", action="store_true", help="Start all tiers in parallel and cancel the rest")
+    parser.add_argument("--baseline-sample-rate", type=float, default=0.1,
+                        help="Fraction of queries on which the last tier is also timed, to report latency saved")
+    parser.add_argument("--baseline-latency", type=float, default=None,
+                        help="Measured latency (s) of the last tier alone; overrides the sampled baseline")
+    parser.add_argument("--static", action="store_true",
+                        help="Serve the static skill tests instead of reading questions from stdin")
+    args = parser.parse_args()
+
+    tiers = [parse_tier(spec) for spec in args.tier]
+    if args.remote:
+        tiers.append(RemoteModel(name=args.remote, model_name=args.remote))
+    check = JudgeCheck(parse_tier(args.judge), threshold=args.threshold) if args.judge else heuristic_check
+    cascade = CascadeModel(tiers, check=check, race=args.race, baseline_sample_rate=args.baseline_sample_rate)
+
+    if args.static:
+        queries = STATIC_SKILL_TESTS
+    else:
+        queries = [SkillTest(skill="query", context="", question=line.strip()) for line in sys.stdin if line.strip()]
+
+    failed = 0
+    try:
+        for query in queries:
+            try:
+                result = cascade.answer(query)
+            except ModelCallError as e:
+                failed += 1
+                print(f"[failed] Q: {query.question}\n{e}\n")
+                continue
+            served_by = f"{result.tier}, rejected" if result.fallback else result.tier
+            print(f"[{served_by} | {result.latency:.2f}s] Q: {query.question}\nA: {result.answer}\n")
+    finally:
+        cascade.close()
+
+    report = cascade.stats.report(baseline_latency=args.baseline_latency)
+    print(f"Served {report['queries']} queries" + (f", {failed} failed" if failed else ""))
+    if report["fallbacks"]:
+        print(f"  {report['fallbacks']} served a rejected answer because later tiers failed")
+    for tier in report["tiers"]:
+        rate = f"{tier['acceptance_rate']:.0%}" if tier["acceptance_rate"] is not None else "N/A"
+        latency = f"{tier['mean_latency']:.2f}s" if tier["mean_latency"] is not None else "N/A"
+        print(f"  {tier['tier']}: attempted {tier['attempted']}, served {tier['served']}, "
+              f"acceptance {rate}, mean latency {latency}")
+    if report["mean_latency_saved"] is not None:
+        print(f"Mean latency {report['mean_latency']:.2f}s vs {report['baseline_latency']:.2f}s "
+              f"for the last tier alone ({report['mean_latency_saved']:.2f}s saved per query)")
+    else:
+        print("No baseline for the last tier; pass --baseline-latency or a non-zero --baseline-sample-rate")
@@ -1,4 +1,6 @@
 import json
+from clients.resilience import ModelCallError
+from evaluation.cost_ledger import charge_context
 from skill_tests.skill_test import SkillTest
 from prompts.skill_prompts import SYSTEM_GENERATE_SKILL_TESTS_PROMPT
 
@@ -13,7 +15,12 @@ def generate_skill_tests(remote_model, skills: list[str], tests_per_skill: int =
         messages = [{"role": "user",
                      "content": SYSTEM_GENERATE_SKILL_TESTS_PROMPT.format(tests_per_skill=tests_per_skill, skill=skill)}]
 
-        response = remote_model.generate_response(messages)
+        try:
+            with charge_context(phase="test-gen", skill=skill):
+                response = remote_model.generate_response(messages)
+        except ModelCallError as e:
+            print(f"Failed to generate tasks for skill '{skill}': {e}")
+            continue
         # Try to parse the response as JSON
         try:
             tasks_data = json.loads(response)
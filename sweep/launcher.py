@@ -0,0 +1,129 @@
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from evaluation import aggregator, runner
+from evaluation.cost_ledger import CostLedger
+from evaluation.results_store import ResultsStore
+from evaluation.streaming import StreamingAggregator
+from skill_tests.skill_test import SkillTest
+from sweep.spec import ModelConfig, SweepSpec
+
+logger = logging.getLogger("SweepLauncher")
+
+
+def schedule(configs: List[ModelConfig]) -> Dict[str, List[List[ModelConfig]]]:
+    """
+    Split configs into execution lanes.
+    Ollama configs are grouped by model so each model's weights are loaded once; within a
+    group they are ordered by num_ctx because changing the context size also reloads the model.
+    OpenAI configs have no load cost and are returned as independent single-config groups.
+    Returns {"ollama": [[group...], ...], "openai": [[config], ...]}.
+    """
+    ollama_groups: Dict[str, List[ModelConfig]] = defaultdict(list)
+    openai_configs: List[List[ModelConfig]] = []
+    for config in configs:
+        if config.model_type == "ollama":
+            ollama_groups[config.model_name].append(config)
+        else:
+            openai_configs.append([config])
+    for group in ollama_groups.values():
+        group.sort(key=lambda c: (c.num_ctx or 0, c.temperature, c.max_tokens))
+    return {"ollama": list(ollama_groups.values()), "openai": openai_configs}
+
+
+def _run_config(config: ModelConfig, remote_model, skill_tests: List[SkillTest],
+                store: ResultsStore, output_dir: str, ledger: Optional[CostLedger] = None,
+                chunk_cache: Optional[ResultsStore] = None) -> Dict[str, Any]:
+    """Evaluate one config and write its results record."""
+    start = time.monotonic()
+    record: Dict[str, Any] = {"config": config.to_dict()}
+    if ledger is not None and ledger.over_hard_budget:
+        # Do not even load the model once the budget is spent
+        record.update({"status": "skipped", "error": "hard budget reached"})
+    else:
+        record.update(_evaluate_config(config, remote_model, skill_tests, store, ledger, chunk_cache))
+    record["wall_time_seconds"] = time.monotonic() - start
+
+    with open(os.path.join(output_dir, f"{config.slug}.json"), "w", encoding="utf-8") as f:
+        json.dump(record, f, indent=2)
+    logger.info(f"Finished '{config.name}' ({record['status']}) in {record['wall_time_seconds']:.1f}s")
+    return record
+
+
+def _evaluate_config(config: ModelConfig, remote_model, skill_tests: List[SkillTest],
+                     store: ResultsStore, ledger: Optional[CostLedger],
+                     chunk_cache: Optional[ResultsStore]) -> Dict[str, Any]:
+    try:
+        model = config.build(chunk_cache=chunk_cache)
+        model.ledger = ledger
+        tracker = StreamingAggregator()
+        scores = runner.run_evaluation([model], remote_model, skill_tests, store=store, tracker=tracker,
+                                       ledger=ledger)
+        model_scores = scores.get(model.name, {})
+        return {
+            "status": "ok",
+            "scores": {skill: list(values) for skill, values in model_scores.items()},
+            "summary": aggregator.summarize_scores({model.name: model_scores}).get(model.name, {}),
+            "cost": store.collect_costs([model], skill_tests, remote_model)[model.name],
+            "evaluated_cells": tracker.completed,
+            "errors": tracker.errors,
+        }
+    except Exception as e:
+        logger.error(f"Config '{config.name}' failed: {e}")
+        return {"status": "failed", "error": str(e)}
+
+
+def run_sweep(spec: SweepSpec, remote_model, skill_tests: List[SkillTest],
+              store: Optional[ResultsStore] = None,
+              ledger: Optional[CostLedger] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Run every config of a sweep and return {config_name: results record}.
+    One lane works through the Ollama groups sequentially (a single server holds one model
+    at a time) while OpenAI configs run concurrently. Every config grades through the remote
+    model, so the Ollama lane takes one slot of the global OpenAI concurrency budget.
+    Records are written to spec.output_dir as they finish, plus a summary.json at the end.
+    Cells already in the results store are not evaluated again. A shared ledger enforces one
+    budget across all configs.
+    """
+    os.makedirs(spec.output_dir, exist_ok=True)
+    store = store or ResultsStore(os.path.join(spec.output_dir, "results_store.jsonl"))
+    lanes = schedule(spec.models)
+    # Chunk answers of chunked configs are cached next to the results store
+    chunk_cache = None
+    if any(config.chunk_tokens is not None for config in spec.models):
+        chunk_cache = ResultsStore(os.path.join(spec.output_dir, "chunk_cache.jsonl"))
+    records: Dict[str, Dict[str, Any]] = {}
+    records_lock = threading.Lock()
+
+    def run_group(group: List[ModelConfig]):
+        for config in group:
+            record = _run_config(config, remote_model, skill_tests, store, spec.output_dir, ledger, chunk_cache)
+            with records_lock:
+                records[config.name] = record
+
+    openai_slots = max(spec.max_openai_concurrency - (1 if lanes["ollama"] else 0), 1)
+    logger.info(f"Sweep '{spec.name}': {len(spec.models)} configs, {len(lanes['ollama'])} Ollama groups, "
+                f"{len(lanes['openai'])} OpenAI configs on {openai_slots} concurrent slots")
+
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="ollama") as ollama_lane, \
+            ThreadPoolExecutor(max_workers=openai_slots, thread_name_prefix="openai") as openai_pool:
+        futures = [ollama_lane.submit(run_group, group) for group in lanes["ollama"]]
+        futures += [openai_pool.submit(run_group, group) for group in lanes["openai"]]
+        for future in futures:
+            future.result()
+
+    summary = {
+        "name": spec.name,
+        "configs": len(spec.models),
+        "failed": sorted(name for name, record in records.items() if record["status"] != "ok"),
+        "summary": {name: record.get("summary", {}) for name, record in records.items()},
+    }
+    with open(os.path.join(spec.output_dir, "summary.json"), "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2)
+    return records
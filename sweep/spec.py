@@ -0,0 +1,148 @@
+import itertools
+import os
+import re
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional
+
+# Fields of a model entry that may be given as a list and are expanded into a matrix
+SWEEP_FIELDS = ("model_type", "model_name", "temperature", "max_tokens", "num_ctx", "chunk_tokens",
+                "chunk_overlap")
+
+
+@dataclass
+class ModelConfig:
+    """One point of the sweep matrix: everything needed to build a LocalModel."""
+    model_type: str
+    model_name: str
+    temperature: float = 0.0
+    max_tokens: int = 1024
+    num_ctx: Optional[int] = None
+    chunk_tokens: Optional[int] = None  # answer long-context tests map-reduce style (models.chunked)
+    chunk_overlap: Optional[int] = None  # tokens shared by consecutive chunks; default min(128, chunk_tokens // 4)
+    name: str = ""
+
+    def __post_init__(self):
+        if self.chunk_overlap is not None:
+            if self.chunk_tokens is None:
+                raise ValueError("chunk_overlap needs chunk_tokens")
+            if not 0 <= self.chunk_overlap < self.chunk_tokens:
+                raise ValueError(f"chunk_overlap must be in [0, chunk_tokens), got {self.chunk_overlap}")
+        if not self.name:
+            parts = [f"{self.model_type}/{self.model_name}", f"t={self.temperature:g}", f"max={self.max_tokens}"]
+            if self.num_ctx is not None:
+                parts.append(f"ctx={self.num_ctx}")
+            if self.chunk_tokens is not None:
+                parts.append(f"chunk={self.chunk_tokens}")
+            if self.chunk_overlap is not None:
+                parts.append(f"overlap={self.chunk_overlap}")
+            self.name = " ".join(parts)
+
+    @property
+    def slug(self) -> str:
+        """Filesystem-safe version of the name, used for per-config result records."""
+        return re.sub(r"[^A-Za-z0-9_.=-]+", "_", self.name).strip("_")
+
+    def build(self, chunk_cache=None):
+        from models.chunked import ChunkedModel
+        from models.local_model import LocalModel
+        model = LocalModel(name=self.name, model_type=self.model_type, model_name=self.model_name,
+                           temperature=self.temperature, max_tokens=self.max_tokens, num_ctx=self.num_ctx)
+        if self.chunk_tokens is not None:
+            overlap = self.chunk_overlap if self.chunk_overlap is not None else min(128, self.chunk_tokens // 4)
+            model = ChunkedModel(model, chunk_tokens=self.chunk_tokens, overlap_tokens=overlap, cache=chunk_cache)
+        return model
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass
+class SweepSpec:
+    """
+    Parsed sweep specification.
+    Example (YAML; TOML uses the same keys):
+
+        name: weekly-capacity
+        remote_model: gpt-4
+        max_openai_concurrency: 8
+        output_dir: sweeps/weekly-capacity
+        tests: static            # or: dynamic, with dynamic_skills / tests_per_skill
+        models:
+          - model_type: ollama
+            model_name: [llama3.2:1b, llama3.1:8b]
+            temperature: [0.0, 0.7]
+            num_ctx: [4096, 16384]
+            chunk_tokens: 3072   # optional: chunked map-reduce answers for long contexts
+            chunk_overlap: 256   # optional: tokens shared by consecutive chunks
+          - model_type: openai
+            model_name: gpt-4o-mini
+            temperature: [0.0, 1.0]
+            max_tokens: [256, 1024]
+
+    Every list-valued field of a model entry is expanded into its cartesian product.
+    """
+    name: str
+    models: List[ModelConfig]
+    remote_model: str = "gpt-4"
+    max_openai_concurrency: int = 4
+    output_dir: str = "sweeps"
+    tests: str = "static"
+    dynamic_skills: List[str] = field(default_factory=lambda: ["summarization", "extraction", "reasoning"])
+    tests_per_skill: int = 2
+
+
+def expand_models(entries: List[Dict[str, Any]]) -> List[ModelConfig]:
+    """
+    Expand model entries with list-valued fields into one ModelConfig per combination.
+    An entry's `name` is used as the prefix of its configs' names, followed by the values
+    of its list-valued fields (e.g. "fast temperature=0.7").
+    Raises ValueError when two configs end up with the same name, or with names that map to
+    the same result file.
+    """
+    configs: List[ModelConfig] = []
+    names = set()
+    slugs: Dict[str, str] = {}
+    for entry in entries:
+        unknown = set(entry) - set(SWEEP_FIELDS) - {"name"}
+        if unknown:
+            raise ValueError(f"Unknown model fields in sweep spec: {sorted(unknown)}")
+        prefix = entry.get("name")
+        axes = {key: value if isinstance(value, list) else [value] for key, value in entry.items() if key != "name"}
+        keys = list(axes)
+        varying = [key for key in keys if isinstance(entry[key], list) and len(entry[key]) > 1]
+        for values in itertools.product(*(axes[k] for k in keys)):
+            fields = dict(zip(keys, values))
+            if prefix:
+                fields["name"] = " ".join([str(prefix)] + [f"{key}={fields[key]}" for key in varying])
+            config = ModelConfig(**fields)
+            if config.name in names:
+                raise ValueError(f"Duplicate model config in sweep spec: '{config.name}'")
+            if config.slug in slugs:
+                raise ValueError(f"Model configs '{slugs[config.slug]}' and '{config.name}' would both write "
+                                 f"their results to {config.slug}.json; give them distinct names")
+            names.add(config.name)
+            slugs[config.slug] = config.name
+            configs.append(config)
+    return configs
+
+
+def load_sweep_spec(path: str) -> SweepSpec:
+    """Load a sweep spec from a .yaml/.yml or .toml file."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext in (".yaml", ".yml"):
+        import yaml
+        with open(path, "r", encoding="utf-8") as f:
+            raw = yaml.safe_load(f)
+    elif ext == ".toml":
+        import tomllib
+        with open(path, "rb") as f:
+            raw = tomllib.load(f)
+    else:
+        raise ValueError(f"Unsupported sweep spec format: {path}")
+
+    raw = dict(raw or {})
+    if not raw.get("models"):
+        raise ValueError(f"Sweep spec {path} defines no models")
+    raw["models"] = expand_models(raw["models"])
+    raw.setdefault("name", os.path.splitext(os.path.basename(path))[0])
+    return SweepSpec(**raw)
@@ -1,10 +1,32 @@
-import matplotlib.pyplot as plt
+import hashlib
+import math
+import os
+import shutil
+import sys
+
+import numpy as np
+
+from evaluation.aggregator import ScoreQuantiles
+
+
+def _pyplot(save_path):
+    """
+    Import pyplot lazily. When the figure is only written to a file, select the
+    non-interactive Agg backend first so no GUI toolkit is loaded.
+    """
+    import matplotlib
+    if save_path and "matplotlib.pyplot" not in sys.modules:
+        matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    return plt
+
 
 def plot_skill_levels(scores: dict, save_path: str = "skill_levels.png"):
     """
     Create a boxplot to visualize the distribution of skill scores for each model per skill.
     Saves the plot to the given path (or shows it if no path provided).
     """
+    plt = _pyplot(save_path)
     skills = sorted({skill for model_scores in scores.values() for skill in model_scores.keys()})
     num_skills = len(skills)
     # Prepare subplots: one boxplot per skill
@@ -29,5 +51,117 @@ def plot_skill_levels(scores: dict, save_path: str = "skill_levels.png"):
     plt.tight_layout()
     if save_path:
         plt.savefig(save_path)
+        plt.close(fig)
     else:
-        plt.show()
\ No newline at end of file
+        plt.show()
+
+
+def _quantiles_hash(summary: ScoreQuantiles, kind: str) -> str:
+    """Hash of everything that determines the rendered figure."""
+    h = hashlib.sha256()
+    h.update(repr((kind, summary.models, summary.skills, summary.levels)).encode("utf-8"))
+    for array in (summary.quantiles, summary.means, summary.counts):
+        h.update(array.tobytes())
+    return h.hexdigest()[:16]
+
+
+def _render_heatmap(plt, summary: ScoreQuantiles):
+    """One cell per (model, skill), colored by the median score."""
+    num_models, num_skills = len(summary.models), len(summary.skills)
+    median = summary.quantiles[:, :, summary.levels.index(0.5)] if 0.5 in summary.levels else summary.means
+    width = min(max(6.0, 0.4 * num_skills + 3), 40)
+    height = min(max(4.0, 0.3 * num_models + 2), 40)
+    fig, ax = plt.subplots(figsize=(width, height))
+    image = ax.imshow(median, vmin=0, vmax=10, cmap="viridis", aspect="auto", interpolation="nearest")
+    ax.set_xticks(range(num_skills))
+    ax.set_xticklabels(summary.skills, rotation=45, ha="right")
+    ax.set_yticks(range(num_models))
+    ax.set_yticklabels(summary.models)
+    ax.set_title("Median score per model and skill")
+    fig.colorbar(image, ax=ax, label="Score")
+    fig.tight_layout()
+    # Cell annotations only stay legible for small matrices
+    if num_models * num_skills <= 400:
+        for (row, col), value in np.ndenumerate(median):
+            if not np.isnan(value):
+                ax.text(col, row, f"{value:.1f}", ha="center", va="center", fontsize=7, color="white")
+    return fig
+
+
+def _render_grid(plt, summary: ScoreQuantiles):
+    """
+    Small multiples, one panel per skill. Each model is drawn as an outer quantile range,
+    an inner quantile range and a median marker, all from pre-aggregated quantiles.
+    """
+    num_models, num_skills = len(summary.models), len(summary.skills)
+    ncols = max(1, math.ceil(math.sqrt(num_skills)))
+    nrows = max(1, math.ceil(num_skills / ncols))
+    panel_height = min(max(2.5, 0.08 * num_models + 1), 6)
+    fig, axes = plt.subplots(nrows, ncols, figsize=(3.5 * ncols, panel_height * nrows),
+                             squeeze=False, sharex=True, sharey=True)
+    y = list(range(num_models))
+    num_levels = len(summary.levels)
+    outer = (0, num_levels - 1)
+    inner = (1, num_levels - 2) if num_levels >= 4 else outer
+    mid = summary.levels.index(0.5) if 0.5 in summary.levels else None
+    # Keep the inner range bar thinner than the row pitch (in points) so rows stay separable
+    inner_width = min(4.0, 0.5 * panel_height * 72 / max(num_models, 1))
+    for i, ax in enumerate(axes.ravel()):
+        if i >= num_skills:
+            ax.set_visible(False)
+            continue
+        q = summary.quantiles[:, i, :]
+        ax.hlines(y, q[:, outer[0]], q[:, outer[1]], color="tab:blue", linewidth=1)
+        ax.hlines(y, q[:, inner[0]], q[:, inner[1]], color="tab:blue", linewidth=inner_width)
+        center = q[:, mid] if mid is not None else summary.means[:, i]
+        ax.plot(center, y, "o", color="black", markersize=3)
+        ax.set_title(summary.skills[i], fontsize=9)
+        ax.set_xlim(0, 10)
+        if i % ncols:
+            # Shared model labels live in the first column; drop the hidden ticks elsewhere
+            ax.tick_params(axis="y", left=False)
+        else:
+            ax.tick_params(axis="y", labelsize=7)
+    axes[0, 0].set_yticks(y)
+    axes[0, 0].set_yticklabels(summary.models)
+    axes[0, 0].invert_yaxis()
+    if num_models * num_skills <= 400:
+        fig.tight_layout()
+    else:
+        # Fixed margins: tight_layout over dozens of panels costs more than rendering them
+        fig.subplots_adjust(left=0.08, right=0.98, bottom=0.03, top=0.97, wspace=0.1, hspace=0.3)
+    return fig
+
+
+def plot_skill_quantiles(summary: ScoreQuantiles, save_path: str = "skill_levels.png",
+                         kind: str = "heatmap", cache_dir: str = ".plot_cache") -> bool:
+    """
+    Plot pre-aggregated score quantiles as a heatmap or a grid of per-skill panels.
+    Suited to sweeps with many models and skills where per-skill boxplots become unreadable.
+    Rendered figures are cached under cache_dir keyed by a hash of the data, so re-running
+    with unchanged results copies the cached image instead of rendering again.
+    Returns True if the figure came from the cache.
+    """
+    renderers = {"heatmap": _render_heatmap, "grid": _render_grid}
+    if kind not in renderers:
+        raise ValueError(f"Unsupported plot kind: {kind}")
+
+    cached_path = None
+    if cache_dir and save_path:
+        ext = os.path.splitext(save_path)[1] or ".png"
+        cached_path = os.path.join(cache_dir, _quantiles_hash(summary, kind) + ext)
+        if os.path.exists(cached_path):
+            shutil.copyfile(cached_path, save_path)
+            return True
+
+    plt = _pyplot(save_path)
+    fig = renderers[kind](plt, summary)
+    if not save_path:
+        plt.show()
+        return False
+    fig.savefig(save_path)
+    plt.close(fig)
+    if cached_path:
+        os.makedirs(cache_dir, exist_ok=True)
+        shutil.copyfile(save_path, cached_path)
+    return False
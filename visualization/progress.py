@@ -0,0 +1,88 @@
+import sys
+import threading
+from typing import List, Optional, TextIO
+
+from evaluation.streaming import StreamingAggregator
+
+
+def _format_duration(seconds: Optional[float]) -> str:
+    if seconds is None:
+        return "--:--"
+    seconds = int(seconds)
+    hours, rest = divmod(seconds, 3600)
+    minutes, secs = divmod(rest, 60)
+    return f"{hours}:{minutes:02d}:{secs:02d}" if hours else f"{minutes:02d}:{secs:02d}"
+
+
+def render_progress(tracker: StreamingAggregator, top_k: int = 5, bar_width: int = 30) -> List[str]:
+    """
+    Render the current state of a run as text lines: progress bar with ETA, throughput,
+    error rate and the per-skill leaderboard (running mean +/- standard error).
+    """
+    snap = tracker.snapshot()
+    done = snap["completed"] + snap["errors"]
+    total = snap["total"]
+    fraction = done / total if total else 0.0
+    filled = int(bar_width * fraction)
+    lines = [
+        f"[{'#' * filled}{'.' * (bar_width - filled)}] {done}/{total} "
+        f"({fraction:.0%})  elapsed {_format_duration(snap['elapsed'])}  ETA {_format_duration(snap['eta_seconds'])}",
+        f"throughput {snap['throughput_per_min']:.1f} tests/min  errors {snap['errors']} ({snap['error_rate']:.1%})",
+    ]
+    for skill, entries in sorted(tracker.leaderboard(snap).items()):
+        settled = " (ranking settled)" if tracker.ranking_settled(entries) else ""
+        lines.append(f"  {skill}{settled}")
+        for rank, (model, mean, std_error, count) in enumerate(entries[:top_k], start=1):
+            se_display = f"{std_error:.2f}" if count > 1 else "-"
+            lines.append(f"    {rank}. {model:<24} {mean:5.2f} +/- {se_display:<5} n={count}")
+    return lines
+
+
+class ProgressDashboard:
+    """
+    Terminal progress view refreshed from a background thread.
+    The evaluation loop only updates the StreamingAggregator; rendering happens here on a
+    fixed interval so it never blocks or slows the loop. On a TTY the view is redrawn in
+    place, otherwise it is appended to the stream at each refresh.
+    """
+    def __init__(self, tracker: StreamingAggregator, interval: float = 1.0,
+                 stream: TextIO = sys.stderr, top_k: int = 5):
+        self.tracker = tracker
+        self.interval = interval
+        self.stream = stream
+        self.top_k = top_k
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._last_height = 0
+        self._in_place = hasattr(stream, "isatty") and stream.isatty()
+
+    def _draw(self):
+        lines = render_progress(self.tracker, top_k=self.top_k)
+        if self._in_place and self._last_height:
+            # Move the cursor up over the previous frame and clear it
+            self.stream.write(f"\x1b[{self._last_height}F\x1b[J")
+        self.stream.write("\n".join(lines) + "\n")
+        self.stream.flush()
+        self._last_height = len(lines)
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            self._draw()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._loop, name="ProgressDashboard", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop refreshing and draw the final state once."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self._draw()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()